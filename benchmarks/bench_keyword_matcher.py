@@ -0,0 +1,94 @@
+"""Compare the single-pass KeywordMatcher with the per-keyword regex scan.
+
+    python benchmarks/bench_keyword_matcher.py --keywords 40 --words 3000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from keyword_matcher import KeywordMatcher
+
+
+def find_keyword_matches_per_keyword(content, keywords, case_sensitive):
+    """The original implementation: one regex scan per keyword"""
+    matches = {keyword: 0 for keyword in keywords}
+
+    if not case_sensitive:
+        content = content.lower()
+
+    for keyword in keywords:
+        search_term = keyword if case_sensitive else keyword.lower()
+        pattern = r'\b' + re.escape(search_term) + r'\b'
+        matches[keyword] = len(re.findall(pattern, content))
+
+    return matches
+
+
+VOCABULARY = ("experience team project managed developed senior engineer data analysis "
+              "communication leadership stakeholder delivery university degree skills "
+              "customer reporting design research responsible improved").split()
+
+
+def make_keywords(count):
+    keywords = [f"Skill{i}" for i in range(count)]
+    # Include overlapping multi-word keywords as found in real category lists
+    keywords[:4] = ["SQL", "SQL Server", "Machine Learning", "Learning"]
+    return keywords
+
+
+def make_document(words, keywords, density, rng):
+    tokens = []
+    for _ in range(words):
+        if rng.random() < density:
+            tokens.append(rng.choice(keywords))
+        else:
+            tokens.append(rng.choice(VOCABULARY))
+    return " ".join(tokens)
+
+
+def time_call(func, documents, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            func(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keywords', type=int, default=40)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--words', type=int, default=1500)
+    parser.add_argument('--density', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--case-sensitive', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keywords = make_keywords(args.keywords)
+    documents = [make_document(args.words, keywords, args.density, rng) for _ in range(args.documents)]
+
+    matcher = KeywordMatcher(keywords, args.case_sensitive)
+    for document in documents:
+        expected = find_keyword_matches_per_keyword(document, keywords, args.case_sensitive)
+        if matcher.count(document) != expected:
+            sys.exit("KeywordMatcher results differ from the per-keyword scan")
+
+    baseline = time_call(lambda d: find_keyword_matches_per_keyword(d, keywords, args.case_sensitive),
+                         documents, args.repeat)
+    single_pass = time_call(matcher.count, documents, args.repeat)
+
+    print(f"{args.documents} documents x {args.words} words, {args.keywords} keywords")
+    print(f"per-keyword regex: {baseline * 1000:9.1f} ms")
+    print(f"single-pass:       {single_pass * 1000:9.1f} ms  ({baseline / single_pass:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
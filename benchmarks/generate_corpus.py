@@ -0,0 +1,142 @@
+"""Generate a synthetic corpus of PDF, DOCX and TXT CVs for benchmarking.
+
+    python benchmarks/generate_corpus.py /tmp/cv_corpus --count 1000 --density 0.02
+"""
+import argparse
+import os
+import random
+
+from docx import Document
+
+# Keywords from the sample "Technology & IT" category in setup_database.py
+DEFAULT_KEYWORDS = ["Python", "JavaScript", "SQL", "Cloud Computing", "Cybersecurity",
+                    "DevOps", "Machine Learning", "API Development", "Docker", "Kubernetes"]
+
+VOCABULARY = ("experience team project managed developed senior engineer data analysis "
+              "communication leadership stakeholder delivery university degree skills "
+              "customer reporting design research responsible improved the and with for "
+              "of in to a delivered built led reduced increased company role").split()
+
+FORMATS = ('pdf', 'docx', 'txt')
+
+
+def make_words(rng, count, keywords, density):
+    """Return count words of filler text with keywords mixed in at the given density"""
+    words = []
+    for _ in range(count):
+        if keywords and rng.random() < density:
+            words.append(rng.choice(keywords))
+        else:
+            words.append(rng.choice(VOCABULARY))
+    return words
+
+
+def wrap(words, width=90):
+    lines = []
+    line = []
+    length = 0
+    for word in words:
+        if line and length + len(word) + 1 > width:
+            lines.append(" ".join(line))
+            line = []
+            length = 0
+        line.append(word)
+        length += len(word) + 1
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """Write a minimal text PDF; pages is a list of lists of lines"""
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count)), page_count),
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        stream = "BT /F1 10 Tf 40 760 Td 12 TL " + " ".join(f"({pdf_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    parts = ["%PDF-1.4\n"]
+    offsets = []
+    position = len(parts[0])
+    for number, body in enumerate(objects, 1):
+        offsets.append(position)
+        obj = f"{number} 0 obj\n{body}\nendobj\n"
+        parts.append(obj)
+        position += len(obj.encode('latin-1'))
+    parts.append(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n")
+    parts.extend(f"{offset:010d} 00000 n \n" for offset in offsets)
+    parts.append(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+
+    with open(path, 'wb') as f:
+        f.write("".join(parts).encode('latin-1'))
+
+
+def write_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_txt(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def generate_corpus(directory, count, formats=FORMATS, words=600, pages=2,
+                    keywords=DEFAULT_KEYWORDS, density=0.02, seed=0):
+    """Write count CVs to directory, cycling through formats, and return their paths.
+
+    Each CV has words words of filler text in which each word is a keyword
+    with probability density. PDFs spread their text over pages pages.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        file_format = formats[i % len(formats)]
+        path = os.path.join(directory, f"cv_{i:06d}.{file_format}")
+        lines = wrap(make_words(rng, words, keywords, density))
+
+        if file_format == 'pdf':
+            per_page = max(1, -(-len(lines) // pages))
+            write_pdf(path, [lines[start:start + per_page] for start in range(0, len(lines), per_page)])
+        elif file_format == 'docx':
+            write_docx(path, lines)
+        else:
+            write_txt(path, lines)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help="comma-separated formats to cycle through (default: pdf,docx,txt)")
+    parser.add_argument('--words', type=int, default=600, help="words per CV")
+    parser.add_argument('--pages', type=int, default=2, help="pages per PDF")
+    parser.add_argument('--density', type=float, default=0.02, help="fraction of words that are keywords")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.directory, args.count, tuple(args.formats.split(',')), args.words,
+                            args.pages, DEFAULT_KEYWORDS, args.density, args.seed)
+    print(f"Wrote {len(paths)} CVs to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Time the CV Shuffler hot paths on synthetic corpora and write the results as JSON.
+
+    python benchmarks/run_benchmarks.py --sizes 100,1000,10000 --output bench_results.json
+
+Stages timed separately for each corpus size:
+  extract_text_from_cv   text extraction (no cache)
+  backend.<name>         extraction with each installed backend, on the files of its format
+  find_keyword_matches   keyword counting over the extracted text
+  find_keyword_context   first-occurrence context lookup for every keyword of every CV
+  keyword_contexts       context of every occurrence from the offsets recorded while matching
+  result_store           storing every CV's counts in a ResultStore and thresholding the scores
+  update_cv_list         rebuilding the GUI CV list (needs PyQt5)
+  bulk_selection         selecting every CV, deselecting half and selecting them again (needs PyQt5)
+  export_selected        exporting every CV as selected (needs PyQt5)
+
+Start-up (importing cv_shuffler and showing the main window) is timed once,
+in fresh interpreters so every import is cold.
+
+The GUI stages run on an offscreen Qt platform and are reported as skipped
+when the GUI cannot be created.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_DIR)
+
+import cv_engine
+from extraction_cache import ExtractionCache
+from extractors import EXTRACTORS, available_extractors, detect_format, open_pages
+from ingestion import find_keyword_matches, find_keyword_offsets
+from result_store import ResultStore
+from generate_corpus import DEFAULT_KEYWORDS, generate_corpus
+
+
+def load_corpus(corpus_dir, size, args):
+    """Generate (or reuse) a corpus of size CVs under corpus_dir"""
+    directory = os.path.join(corpus_dir, f"{size}_{args.density}_{args.words}")
+    if os.path.isdir(directory) and len(os.listdir(directory)) == size:
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory))
+    return generate_corpus(directory, size, words=args.words, pages=args.pages, density=args.density)
+
+
+def timed(results, size, stage, items, func, num_bytes=None):
+    start = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - start
+    results.append({
+        "size": size,
+        "stage": stage,
+        "items": items,
+        "seconds": seconds,
+        "items_per_second": items / seconds if seconds > 0 else None,
+    })
+    if num_bytes is not None:
+        results[-1]["bytes_per_second"] = num_bytes / seconds if seconds > 0 else None
+    print(f"{size:>7} {stage:<22} {seconds:9.3f}s  {items / seconds if seconds else 0:12.1f} items/s")
+    return value
+
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+import cv_shuffler
+app = QApplication(sys.argv)
+window = cv_shuffler.CVShufflerApp()
+window.show()
+app.processEvents()
+print(time.perf_counter() - start)
+window.close()
+"""
+
+
+def time_startup(runs, results):
+    """Time importing cv_shuffler and showing the window, each run in a new interpreter"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    seconds = []
+    for _ in range(runs):
+        try:
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=REPO_DIR, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            seconds.append(float(output.split()[-1]))
+        except (subprocess.CalledProcessError, ValueError, IndexError) as e:
+            results.append({"size": None, "stage": "startup", "skipped": f"GUI unavailable: {e}"})
+            print(f"{'':>7} {'startup':<22} skipped ({e})")
+            return
+    results.append({
+        "size": None,
+        "stage": "startup",
+        "items": runs,
+        "seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+    })
+    print(f"{'':>7} {'startup':<22} {statistics.median(seconds):9.3f}s  (median of {runs}, "
+          f"best {min(seconds):.3f}s)")
+
+
+def create_gui():
+    """Return (app, window), or (None, reason) if the GUI can't be created"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt5.QtWidgets import QApplication
+        import cv_shuffler
+        app = QApplication.instance() or QApplication(sys.argv)
+        return app, cv_shuffler.CVShufflerApp()
+    except Exception as e:
+        return None, f"GUI unavailable: {e}"
+
+
+def run_size(size, paths, keywords, gui, scratch_dir, results):
+    texts = timed(results, size, "extract_text_from_cv", len(paths),
+                  lambda: [cv_engine.extract_text(path) for path in paths])
+
+    for file_format in EXTRACTORS:
+        format_paths = [path for path in paths if detect_format(path) == file_format]
+        num_bytes = sum(os.path.getsize(path) for path in format_paths)
+        for extractor in available_extractors(file_format) if format_paths else ():
+            timed(results, size, f"backend.{extractor.name}", len(format_paths),
+                  lambda: ["".join(open_pages(path, file_format, extractor.name)[1]) for path in format_paths],
+                  num_bytes)
+
+    matches = timed(results, size, "find_keyword_matches", len(texts),
+                    lambda: [find_keyword_matches(text, keywords, False) for text in texts])
+
+    timed(results, size, "find_keyword_context", len(texts) * len(keywords),
+          lambda: [cv_engine.find_keyword_context(text, keyword, False)
+                   for text in texts for keyword in keywords])
+
+    offsets = [find_keyword_offsets(text, keywords, False) for text in texts]
+    timed(results, size, "keyword_contexts", len(texts) * len(keywords),
+          lambda: [cv_engine.keyword_contexts(text, found.positions(i).tolist(), len(keyword))
+                   for text, found in zip(texts, offsets) for i, keyword in enumerate(keywords)])
+
+    def store_results():
+        store = ResultStore(keywords)
+        store.add_many(zip(paths, matches))
+        store.at_least(5)
+        return store
+
+    store = timed(results, size, "result_store", len(paths), store_results)
+
+    app, window = gui
+    if app is None:
+        for stage in ("update_cv_list", "bulk_selection", "export_selected"):
+            results.append({"size": size, "stage": stage, "skipped": window})
+            print(f"{size:>7} {stage:<22} skipped ({window})")
+        return
+
+    window.cv_files = list(paths)
+    window.results = store
+
+    def update_cv_list():
+        window.update_cv_list()
+        app.processEvents()
+
+    timed(results, size, "update_cv_list", len(paths), update_cv_list)
+
+    def bulk_selection():
+        window.selection.set_paths(paths)
+        window.selection.remove_many(paths[::2])
+        window.selection.add_many(paths)
+        app.processEvents()
+
+    timed(results, size, "bulk_selection", len(paths), bulk_selection)
+
+    # Export through a throwaway cache so the user's text cache isn't touched
+    export_path = os.path.join(scratch_dir, f"export_{size}.csv")
+    window.selection.set_paths(paths)
+    window.extraction_cache.close()
+    window.extraction_cache = ExtractionCache(os.path.join(scratch_dir, f"cache_{size}.db"))
+    with mock.patch('cv_shuffler.QFileDialog.getSaveFileName', return_value=(export_path, '')), \
+            mock.patch('cv_shuffler.QMessageBox.information'):
+        timed(results, size, "export_selected", len(paths), window.export_selected)
+    window.extraction_cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help="comma-separated corpus sizes")
+    parser.add_argument('--corpus-dir', default=None,
+                        help="where to generate (and reuse) corpora (default: a temporary directory)")
+    parser.add_argument('--words', type=int, default=600, help="words per CV")
+    parser.add_argument('--pages', type=int, default=2, help="pages per PDF")
+    parser.add_argument('--density', type=float, default=0.02, help="fraction of words that are keywords")
+    parser.add_argument('--no-gui', action='store_true', help="skip the stages that need PyQt5")
+    parser.add_argument('--startup-runs', type=int, default=5,
+                        help="cold start-ups to time (0 to skip)")
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    keywords = list(DEFAULT_KEYWORDS)
+    gui = (None, "disabled with --no-gui") if args.no_gui else create_gui()
+    results = []
+    if args.startup_runs and not args.no_gui:
+        time_startup(args.startup_runs, results)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        corpus_dir = args.corpus_dir or os.path.join(scratch_dir, 'corpus')
+        for size in sizes:
+            paths = load_corpus(corpus_dir, size, args)
+            run_size(size, paths, keywords, gui, scratch_dir, results)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "keywords": len(keywords),
+            "words_per_cv": args.words,
+            "pages_per_pdf": args.pages,
+            "density": args.density,
+        },
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import os
+import re
+
+from extraction_cache import ExtractionCache
+from keyword_matcher import get_matcher
+
+
+class CorpusIndex:
+    """Full-text (FTS5) index of the extracted CV text in the text cache.
+
+    The index is used as a pre-filter: CVs that contain none of the keywords
+    are scored as zero without being read, and the remaining candidates are
+    counted exactly from their stored text, so results match a full rescan.
+
+    cv_text_index is an external-content FTS5 table over the cache's
+    extracted_text table: it holds only the inverted index and is kept in
+    step with the cache by triggers, so each CV's text is stored once.
+    """
+
+    def __init__(self, cache):
+        # The ExtractionCache's Database, shared between the GUI thread and
+        # the filter worker thread
+        self.database = cache.database
+        with self.database.transaction() as connection:
+            exists = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cv_text_index'").fetchone()
+            connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS cv_text_index "
+                               "USING fts5(text, content='extracted_text', content_rowid='rowid')")
+            connection.execute('''
+            CREATE TRIGGER IF NOT EXISTS extracted_text_insert AFTER INSERT ON extracted_text BEGIN
+                INSERT INTO cv_text_index (rowid, text) VALUES (new.rowid, new.text);
+            END
+            ''')
+            connection.execute('''
+            CREATE TRIGGER IF NOT EXISTS extracted_text_delete AFTER DELETE ON extracted_text BEGIN
+                INSERT INTO cv_text_index (cv_text_index, rowid, text) VALUES ('delete', old.rowid, old.text);
+            END
+            ''')
+            connection.execute('''
+            CREATE TRIGGER IF NOT EXISTS extracted_text_update AFTER UPDATE ON extracted_text BEGIN
+                INSERT INTO cv_text_index (cv_text_index, rowid, text) VALUES ('delete', old.rowid, old.text);
+                INSERT INTO cv_text_index (rowid, text) VALUES (new.rowid, new.text);
+            END
+            ''')
+            if not exists:
+                # Index the text cached before the index existed
+                connection.execute("INSERT INTO cv_text_index (cv_text_index) VALUES ('rebuild')")
+
+    def is_current(self, file_path):
+        """Return True if file_path is indexed with its current size and mtime"""
+        row = self.database.query_one("SELECT size, mtime_ns FROM extracted_text WHERE path = ?",
+                                      (os.path.abspath(file_path),))
+        if row is None:
+            return False
+        try:
+            return ExtractionCache.fingerprint(file_path) == row
+        except OSError:
+            return False
+
+    def get_text(self, file_path):
+        row = self.database.query_one("SELECT text FROM extracted_text WHERE path = ?",
+                                      (os.path.abspath(file_path),))
+        return row[0] if row else None
+
+    def candidate_paths(self, keywords):
+        """Return absolute paths of CVs that may contain any keyword.
+
+        Returns None when a keyword has no indexable characters (e.g. "++"),
+        in which case every CV has to be counted.
+        """
+        phrases = []
+        for keyword in keywords:
+            if not re.search(r'[^\W_]', keyword):
+                return None
+            phrases.append('"' + keyword.replace('"', '""') + '"')
+        if not phrases:
+            return set()
+
+        rows = self.database.query(
+            "SELECT path FROM extracted_text WHERE rowid IN "
+            "(SELECT rowid FROM cv_text_index WHERE cv_text_index MATCH ?)", (" OR ".join(phrases),))
+        return {path for (path,) in rows}
+
+    def scorer(self, keywords, case_sensitive):
+        """Return a function giving the MatchOffsets of an indexed CV.
+
+        The function returns None for CVs that are not indexed or have changed
+        since, so the caller can extract them instead. The fingerprints of
+        every indexed CV are read in one query up front, so CVs without any
+        keyword are answered with a stat and no query; only candidates are
+        read and counted.
+        """
+        matcher = get_matcher(tuple(keywords), case_sensitive)
+        candidates = self.candidate_paths(keywords)
+        fingerprints = {path: (size, mtime_ns) for path, size, mtime_ns
+                        in self.database.query("SELECT path, size, mtime_ns FROM extracted_text")}
+        no_matches = matcher.scan("")
+
+        def score(file_path):
+            path = os.path.abspath(file_path)
+            fingerprint = fingerprints.get(path)
+            if fingerprint is None:
+                return None
+            try:
+                if ExtractionCache.fingerprint(file_path) != fingerprint:
+                    return None
+            except OSError:
+                return None
+            if candidates is None or path in candidates:
+                return matcher.scan(self.get_text(file_path) or "")
+            return no_matches
+
+        return score
@@ -0,0 +1,167 @@
+"""Screening engine shared by the desktop app and the command line.
+
+Nothing in this module (or the modules it imports) depends on Qt, so it can
+run on a server or from cron.
+"""
+import csv
+import os
+import re
+
+from ingestion import IngestionEngine, SUPPORTED_EXTENSIONS, discover_cv_files, read_cv_text
+from result_store import ResultStore
+
+
+def get_data_dir():
+    """Return the data directory next to the application, creating it if needed"""
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+    return data_dir
+
+
+def get_db_path():
+    return os.path.join(get_data_dir(), 'cv_shuffler.db')
+
+
+def get_cache_path():
+    return os.path.join(get_data_dir(), 'text_cache.db')
+
+
+def get_sessions_dir():
+    return os.path.join(get_data_dir(), 'sessions')
+
+
+def list_cv_files(directory, recursive=False):
+    """Return the supported CV files in a directory (lazily when recursive)"""
+    if recursive:
+        return discover_cv_files(directory)
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(SUPPORTED_EXTENSIONS))
+
+
+def parse_keywords(keywords_text):
+    return [k.strip() for k in keywords_text.split(',') if k.strip()]
+
+
+def load_category_keywords(database, category_name):
+    rows = database.query("""SELECT k.keyword FROM keywords k JOIN job_categories c ON c.id = k.category_id
+                             WHERE c.name = ? ORDER BY k.keyword""", (category_name,))
+    return [keyword for (keyword,) in rows]
+
+
+def load_keyword_set(database, set_name):
+    """Return {keyword: weight} for a keyword set"""
+    return dict(database.query("""SELECT k.keyword, m.weight FROM keyword_set_mappings m
+                                  JOIN keywords k ON k.id = m.keyword_id
+                                  JOIN keyword_sets s ON s.id = m.set_id
+                                  WHERE s.name = ? ORDER BY m.weight DESC, k.keyword""", (set_name,)))
+
+
+def import_keywords_csv(database, file_path, category_id=None):
+    """Import keywords from a CSV file in a single transaction.
+
+    Each row is `keyword` or `keyword,category` (an optional header row
+    starting with "keyword" is skipped). Rows without a category go to
+    category_id, categories that don't exist yet are created and keywords
+    that already exist are left alone. Returns the number of keywords added.
+    """
+    rows = []
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        for record in csv.reader(f):
+            if record and record[0].strip():
+                rows.append((record[0].strip(), record[1].strip() if len(record) > 1 else ""))
+    if rows and rows[0][0].lower() == "keyword":
+        rows = rows[1:]
+
+    with database.transaction() as connection:
+        connection.executemany("INSERT OR IGNORE INTO job_categories (name) VALUES (?)",
+                               {(category,) for _, category in rows if category})
+        category_ids = dict(connection.execute("SELECT name, id FROM job_categories"))
+        before = connection.total_changes
+        connection.executemany("INSERT OR IGNORE INTO keywords (keyword, category_id) VALUES (?, ?)",
+                               [(keyword, category_ids[category] if category else category_id)
+                                for keyword, category in rows])
+        return connection.total_changes - before
+
+
+def extract_text(file_path, cache=None):
+    """Return a CV's text, or a message describing why there is none"""
+    text = cache.get(file_path) if cache is not None else None
+    if text is None:
+        try:
+            text = read_cv_text(file_path)
+            if cache is not None:
+                cache.put(file_path, text)
+        except Exception as e:
+            text = f"Error reading file: {str(e)}"
+
+    return text if text else "No text could be extracted from this file."
+
+
+def find_keyword_context(content, keyword, case_sensitive):
+    """Return the text around the first occurrence of keyword, with the keyword in brackets"""
+    if not case_sensitive:
+        content = content.lower()
+        keyword = keyword.lower()
+
+    # Find the first occurrence of the keyword
+    pos = content.find(keyword)
+    if pos == -1:
+        return "Not found"
+
+    # Extract context around the keyword
+    start = max(0, pos - 40)
+    end = min(len(content), pos + len(keyword) + 40)
+    context = content[start:end]
+
+    # Highlight the keyword in the context
+    if case_sensitive:
+        context = context.replace(keyword, f"[{keyword}]")
+    else:
+        # Case insensitive replacement
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+        context = pattern.sub(r"[\g<0>]", context)
+
+    return context
+
+
+def keyword_contexts(content, positions, length, width=40):
+    """Return the text around each occurrence of a keyword, with the keyword in brackets.
+
+    positions are the occurrences' start offsets (e.g. from MatchOffsets) and
+    length the keyword's length, so nothing has to be searched again.
+    """
+    contexts = []
+    for pos in positions:
+        start = max(0, pos - width)
+        end = min(len(content), pos + length + width)
+        contexts.append(f"{content[start:pos]}[{content[pos:pos + length]}]{content[pos + length:end]}")
+    return contexts
+
+
+def screen(file_paths, keywords, case_sensitive=False, weights=None, engine=None, cache=None,
+           index=None, early_exit_threshold=None, max_pages=None, duplicates=None):
+    """Score CVs against keywords.
+
+    Returns (a ResultStore of the counts, pandas Series of weighted scores).
+    With early_exit_threshold or max_pages, PDFs are only read until their
+    outcome is certain, so their counts can be lower bounds. CVs are signed
+    into duplicates (a DuplicateIndex) if given.
+    """
+    import pandas as pd
+    engine = engine or IngestionEngine()
+    results = ResultStore(keywords, weights)
+    for chunk in engine.run(file_paths, keywords, case_sensitive, cache=cache, index=index,
+                            threshold=early_exit_threshold, weights=weights, max_pages=max_pages,
+                            duplicates=duplicates):
+        results.add_many((file_path, matches) for file_path, matches, _ in chunk)
+    return results, pd.Series(results.scores.copy(), index=list(results.paths))
+
+
+def rank_relevance(file_paths, query, weights=None, cache=None, index=None):
+    """Return a pandas Series of each CV's BM25 relevance to query (a keyword list or a job
+    description), as a percentage of the best CV's"""
+    import pandas as pd
+    from ranking import BM25Index, corpus_texts
+    ranking_index = BM25Index.build(corpus_texts(file_paths, cache, index))
+    return pd.Series(ranking_index.relevance(query, weights), dtype=float)
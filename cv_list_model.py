@@ -0,0 +1,192 @@
+import os
+import random
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QColor
+
+ScoreRole = Qt.UserRole + 1
+
+
+class CVListModel(QAbstractListModel):
+    """CV files and their scores for the CV list view.
+
+    Scores live in a flat NumPy array (NaN = not scored yet) and row text and
+    colours are computed on demand, so re-scoring or shuffling only emits
+    dataChanged instead of rebuilding list items.
+    """
+
+    HIGH_MATCH_COLOUR = QColor(200, 255, 200)  # Light green for twice the threshold or more
+    MEDIUM_MATCH_COLOUR = QColor(255, 255, 200)  # Light yellow for the threshold or more
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.names = []
+        self.rows = {}  # file path -> row
+        self.scores = np.full(0, np.nan)
+        self.score_label = "matches"
+        self.threshold = 5
+        self.duplicate_of = {}  # file path -> path of the CV it duplicates
+        self.duplicates = {}  # file path -> paths of its duplicates
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        score = self.scores[row]
+        if role == Qt.DisplayRole:
+            text = self.names[row] if np.isnan(score) else f"{self.names[row]} ({score:.0f} {self.score_label})"
+            duplicates = self.duplicates.get(self.paths[row])
+            if duplicates:
+                text += f" [+{len(duplicates)} duplicate{'s' if len(duplicates) > 1 else ''}]"
+            return text
+        if role == Qt.ToolTipRole:
+            path = self.paths[row]
+            if path in self.duplicate_of:
+                return f"Duplicate of {os.path.basename(self.duplicate_of[path])}"
+            if path in self.duplicates:
+                return "Also received as: " + ", ".join(os.path.basename(dup) for dup in self.duplicates[path])
+            return path
+        if role == Qt.BackgroundRole:
+            # Color code based on the score relative to the threshold
+            if score >= 2 * self.threshold:
+                return self.HIGH_MATCH_COLOUR
+            if score >= self.threshold:
+                return self.MEDIUM_MATCH_COLOUR
+            return None
+        if role == Qt.UserRole:
+            return self.paths[row]
+        if role == ScoreRole:
+            # Unscored CVs sort below everything else
+            return float('-inf') if np.isnan(score) else float(score)
+        return None
+
+    def set_files(self, paths):
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.names = [os.path.basename(path) for path in self.paths]
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.scores = np.full(len(self.paths), np.nan)
+        self.duplicate_of = {}
+        self.duplicates = {}
+        self.endResetModel()
+
+    def append_files(self, paths):
+        paths = [path for path in paths if path not in self.rows]
+        if not paths:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        for row, path in enumerate(paths, first):
+            self.paths.append(path)
+            self.names.append(os.path.basename(path))
+            self.rows[path] = row
+        self.scores = np.concatenate([self.scores, np.full(len(paths), np.nan)])
+        self.endInsertRows()
+
+    def remove_files(self, paths):
+        removed = set(paths) & self.rows.keys()
+        if not removed:
+            return
+        keep = [row for row, path in enumerate(self.paths) if path not in removed]
+        self.beginResetModel()
+        self.paths = [self.paths[row] for row in keep]
+        self.names = [self.names[row] for row in keep]
+        self.scores = self.scores[keep]
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.endResetModel()
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+        if self.paths:
+            # Only the colours change; the view repaints the visible rows
+            self.dataChanged.emit(self.index(0), self.index(len(self.paths) - 1), [Qt.BackgroundRole])
+
+    def set_scores(self, scores):
+        """Replace all scores from {file_path: score}"""
+        self.scores[:] = np.nan
+        for path, score in scores.items():
+            row = self.rows.get(path)
+            if row is not None:
+                self.scores[row] = score
+        self.emit_all_changed()
+
+    def update_scores(self, scores):
+        """Update the scores of some CVs from {file_path: score}"""
+        changed = []
+        for path, score in scores.items():
+            row = self.rows.get(path)
+            if row is not None:
+                self.scores[row] = score
+                changed.append(row)
+        if changed:
+            self.dataChanged.emit(self.index(min(changed)), self.index(max(changed)))
+
+    def set_duplicates(self, duplicate_of):
+        """Mark near-duplicates from {file_path: path of the CV it duplicates}"""
+        self.duplicate_of = {path: original for path, original in duplicate_of.items() if path in self.rows}
+        self.duplicates = {}
+        for path, original in self.duplicate_of.items():
+            self.duplicates.setdefault(original, []).append(path)
+        self.emit_all_changed()
+
+    def set_score_label(self, label):
+        if label != self.score_label:
+            self.score_label = label
+            self.emit_all_changed()
+
+    def shuffle(self):
+        """Shuffle the rows in place and return the new path order"""
+        order = list(range(len(self.paths)))
+        random.shuffle(order)
+        self.paths = [self.paths[row] for row in order]
+        self.names = [self.names[row] for row in order]
+        self.scores = self.scores[order]
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.emit_all_changed()
+        return list(self.paths)
+
+    def emit_all_changed(self):
+        if self.paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self.paths) - 1))
+
+
+class CVFilterProxyModel(QSortFilterProxyModel):
+    """Sorts the CV list by score and optionally hides CVs below a minimum score and duplicates"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_score = None
+        self.collapse_duplicates = False
+        self.setSortRole(ScoreRole)
+        self.setDynamicSortFilter(True)
+
+    def set_min_score(self, min_score):
+        """Hide CVs scoring below min_score; None shows every CV"""
+        self.min_score = min_score
+        self.invalidateFilter()
+
+    def set_collapse_duplicates(self, enabled):
+        """Show only the original (highest scoring) CV of each group of near-duplicates"""
+        self.collapse_duplicates = enabled
+        self.invalidateFilter()
+
+    def set_sort_by_score(self, enabled):
+        if enabled:
+            self.sort(0, Qt.DescendingOrder)
+        else:
+            # Back to the (shuffled) source order
+            self.sort(-1)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        if self.collapse_duplicates and model.paths[source_row] in model.duplicate_of:
+            return False
+        if self.min_score is None:
+            return True
+        return bool(model.scores[source_row] >= self.min_score)
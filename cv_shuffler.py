@@ -1,9 +1,9 @@
+import time
+STARTED_AT = time.perf_counter()  # start-up time is measured from here to the first idle event loop
 import sys
 import os
 import random
-import pandas as pd
 import re
-import sqlite3
 import tempfile
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QListWidget, QLabel, 
@@ -11,35 +11,42 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QListWidgetItem, QCheckBox, QScrollArea, QFrame,
                              QLineEdit, QGroupBox, QSpinBox, QTableWidget,
                              QTableWidgetItem, QHeaderView, QTabWidget, QComboBox,
-                             QDialog, QFormLayout, QDialogButtonBox)
-from PyQt5.QtCore import Qt, QSize, QUrl
+                             QDialog, QFormLayout, QDialogButtonBox, QProgressBar,
+                             QInputDialog, QListView, QSlider)
+from PyQt5.QtCore import Qt, QSize, QUrl, QFileSystemWatcher, QTimer
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-import PyPDF2
-from docx import Document
+from database import Database
+from extraction_cache import ExtractionCache
+from ingestion import IngestionEngine, discover_cv_files, find_keyword_matches, find_keyword_offsets
+import cv_engine
+from workers import KeywordFilterWorker, PreviewPrefetchWorker, RankingIndexWorker
+from preview_cache import PreviewCache
+from export_engine import EXPORT_FILTER, export_candidates
+from corpus_index import CorpusIndex
+from dedup import DuplicateIndex, originals
+from folder_watch import FolderFingerprints
+from cv_list_model import CVListModel, CVFilterProxyModel
+from result_store import ResultStore
+from score_histogram import ScoreHistogram
+from selection_manager import SelectionManager, parse_score_range, paths_in_folder, paths_matching_name
+from session_store import ReviewSession, SessionStore
+from instrumentation import stats
+from setup_database import setup_database
 
 # Set HighDPI scaling before creating QApplication
 QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
 QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+# Required to import QtWebEngine after QApplication is created (see preview_widget)
+QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
 
 class KeywordManagerDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, database, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Keyword Manager")
-        self.setGeometry(200, 200, 600, 500)
-        self.db_connection = self.create_db_connection()
+        self.setGeometry(200, 200, 600, 700)
+        self.database = database
         self.initUI()
         
-    def create_db_connection(self):
-        """Create database connection with proper path handling"""
-        # Ensure data directory exists
-        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        
-        db_path = os.path.join(data_dir, 'cv_shuffler.db')
-        return sqlite3.connect(db_path)
-        
     def initUI(self):
         layout = QVBoxLayout(self)
         
@@ -56,6 +63,10 @@ class KeywordManagerDialog(QDialog):
         add_keyword_btn.clicked.connect(self.add_keyword)
         form_layout.addRow("", add_keyword_btn)
         
+        import_keywords_btn = QPushButton("Import Keywords from CSV...")
+        import_keywords_btn.clicked.connect(self.import_keywords)
+        form_layout.addRow("", import_keywords_btn)
+        
         layout.addLayout(form_layout)
         
         # Keywords list
@@ -68,6 +79,37 @@ class KeywordManagerDialog(QDialog):
         delete_btn.clicked.connect(self.delete_keyword)
         layout.addWidget(delete_btn)
         
+        # Weighted keyword sets
+        set_group = QGroupBox("Keyword Sets")
+        set_layout = QVBoxLayout(set_group)
+        
+        set_select_layout = QHBoxLayout()
+        self.set_combo = QComboBox()
+        set_select_layout.addWidget(self.set_combo, 1)
+        new_set_btn = QPushButton("New Set")
+        new_set_btn.clicked.connect(self.add_keyword_set)
+        set_select_layout.addWidget(new_set_btn)
+        set_layout.addLayout(set_select_layout)
+        
+        weight_layout = QHBoxLayout()
+        weight_layout.addWidget(QLabel("Weight:"))
+        self.weight_spin = QSpinBox()
+        self.weight_spin.setRange(1, 10)
+        weight_layout.addWidget(self.weight_spin)
+        add_to_set_btn = QPushButton("Add Selected Keyword to Set")
+        add_to_set_btn.clicked.connect(self.add_keyword_to_set)
+        weight_layout.addWidget(add_to_set_btn)
+        set_layout.addLayout(weight_layout)
+        
+        self.set_keywords_list = QListWidget()
+        set_layout.addWidget(self.set_keywords_list)
+        
+        remove_from_set_btn = QPushButton("Remove Keyword from Set")
+        remove_from_set_btn.clicked.connect(self.remove_keyword_from_set)
+        set_layout.addWidget(remove_from_set_btn)
+        
+        layout.addWidget(set_group)
+        
         # Dialog buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok)
         button_box.accepted.connect(self.accept)
@@ -77,10 +119,11 @@ class KeywordManagerDialog(QDialog):
         self.category_combo.currentIndexChanged.connect(self.load_keywords)
         self.load_keywords()
         
+        self.set_combo.currentIndexChanged.connect(self.load_set_keywords)
+        self.load_keyword_sets()
+        
     def load_categories(self):
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT id, name FROM job_categories ORDER BY name")
-        categories = cursor.fetchall()
+        categories = self.database.query("SELECT id, name FROM job_categories ORDER BY name")
         
         self.category_combo.clear()
         for category_id, category_name in categories:
@@ -91,9 +134,8 @@ class KeywordManagerDialog(QDialog):
         category_id = self.category_combo.currentData()
         
         if category_id:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT keyword FROM keywords WHERE category_id = ? ORDER BY keyword", (category_id,))
-            keywords = cursor.fetchall()
+            keywords = self.database.query("SELECT keyword FROM keywords WHERE category_id = ? ORDER BY keyword",
+                                           (category_id,))
             
             for (keyword,) in keywords:
                 self.keywords_list.addItem(keyword)
@@ -107,16 +149,28 @@ class KeywordManagerDialog(QDialog):
             return
             
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("INSERT OR IGNORE INTO keywords (keyword, category_id) VALUES (?, ?)", 
-                          (keyword, category_id))
-            self.db_connection.commit()
+            self.database.execute("INSERT OR IGNORE INTO keywords (keyword, category_id) VALUES (?, ?)", 
+                                  (keyword, category_id))
             
             self.keyword_input.clear()
             self.load_keywords()
             
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Could not add keyword: {str(e)}")
+            
+    def import_keywords(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Import Keywords", "", "CSV Files (*.csv)")
+        if not file_path:
+            return
+            
+        try:
+            added = cv_engine.import_keywords_csv(self.database, file_path, self.category_combo.currentData())
+            self.load_categories()
+            self.load_keywords()
+            QMessageBox.information(self, "Import Complete", f"Imported {added} new keywords.")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Import Error", f"Could not import keywords: {str(e)}")
     
     def delete_keyword(self):
         current_item = self.keywords_list.currentItem()
@@ -129,37 +183,143 @@ class KeywordManagerDialog(QDialog):
         
         if reply == QMessageBox.Yes:
             try:
-                cursor = self.db_connection.cursor()
-                cursor.execute("DELETE FROM keywords WHERE keyword = ?", (keyword,))
-                self.db_connection.commit()
+                with self.database.transaction() as connection:
+                    connection.execute("DELETE FROM keyword_set_mappings WHERE keyword_id IN "
+                                       "(SELECT id FROM keywords WHERE keyword = ?)", (keyword,))
+                    connection.execute("DELETE FROM keywords WHERE keyword = ?", (keyword,))
                 self.load_keywords()
+                self.load_set_keywords()
                 
             except Exception as e:
                 QMessageBox.critical(self, "Database Error", f"Could not delete keyword: {str(e)}")
     
-    def closeEvent(self, event):
-        self.db_connection.close()
-        event.accept()
+    def load_keyword_sets(self):
+        keyword_sets = self.database.query("SELECT id, name FROM keyword_sets ORDER BY name")
+        
+        self.set_combo.clear()
+        for set_id, set_name in keyword_sets:
+            self.set_combo.addItem(set_name, set_id)
+    
+    def load_set_keywords(self):
+        self.set_keywords_list.clear()
+        set_id = self.set_combo.currentData()
+        
+        if set_id:
+            mappings = self.database.query("""SELECT m.id, k.keyword, m.weight FROM keyword_set_mappings m
+                                              JOIN keywords k ON k.id = m.keyword_id
+                                              WHERE m.set_id = ? ORDER BY m.weight DESC, k.keyword""", (set_id,))
+            
+            for mapping_id, keyword, weight in mappings:
+                item = QListWidgetItem(f"{keyword} (weight {weight})")
+                item.setData(Qt.UserRole, mapping_id)
+                self.set_keywords_list.addItem(item)
+    
+    def add_keyword_set(self):
+        name, ok = QInputDialog.getText(self, "New Keyword Set", "Set name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+            
+        try:
+            self.database.execute("INSERT OR IGNORE INTO keyword_sets (name) VALUES (?)", (name,))
+            
+            self.load_keyword_sets()
+            self.set_combo.setCurrentIndex(self.set_combo.findText(name))
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Could not add keyword set: {str(e)}")
+    
+    def add_keyword_to_set(self):
+        current_item = self.keywords_list.currentItem()
+        set_id = self.set_combo.currentData()
+        if not current_item or not set_id:
+            QMessageBox.warning(self, "Selection Error", "Please select a keyword and a keyword set.")
+            return
+            
+        keyword = current_item.text()
+        weight = self.weight_spin.value()
+        try:
+            with self.database.transaction() as connection:
+                keyword_id = connection.execute("SELECT id FROM keywords WHERE keyword = ?", (keyword,)).fetchone()[0]
+                
+                # Update the weight if the keyword is already in the set
+                cursor = connection.execute(
+                    "UPDATE keyword_set_mappings SET weight = ? WHERE set_id = ? AND keyword_id = ?",
+                    (weight, set_id, keyword_id))
+                if cursor.rowcount == 0:
+                    connection.execute("INSERT INTO keyword_set_mappings (set_id, keyword_id, weight) VALUES (?, ?, ?)",
+                                       (set_id, keyword_id, weight))
+            self.load_set_keywords()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Could not add keyword to set: {str(e)}")
+    
+    def remove_keyword_from_set(self):
+        current_item = self.set_keywords_list.currentItem()
+        if not current_item:
+            return
+            
+        try:
+            self.database.execute("DELETE FROM keyword_set_mappings WHERE id = ?", (current_item.data(Qt.UserRole),))
+            self.load_set_keywords()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Could not remove keyword from set: {str(e)}")
+
 
 class CVShufflerApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.cv_files = []
-        self.selected_candidates = []
-        self.keyword_matches = {}
+        self.selection = SelectionManager(self)  # the selected candidates, in selection order
+        self.results = ResultStore()  # keyword counts and scores of the scored CVs
+        self.keyword_offsets = {}  # file path -> MatchOffsets of offset_keywords
+        self.offset_keywords = ()  # keywords the offsets were scanned for, in offsets order
+        self.keyword_weights = {}  # keyword -> weight from the loaded keyword set
+        self.score_distribution = None  # sorted scores for the threshold, built on demand
+        self.live_distribution = None  # distribution the live selection was taken from
+        self.scored_keywords = []
+        self.scored_case_sensitive = None
+        # Early exit threshold of the scan; counts that reached it are only lower bounds
+        self.scan_threshold = None
+        # Relevance ranking: BM25 index of the scored CVs, built in the background
+        self.ranking_index = None
+        self.ranking_worker = None
+        self.job_description = None  # ranks by this text instead of the keywords when set
         self.temp_files = []  # To keep track of temporary files
-        self.db_connection = self.create_db_connection()
+        self.database = Database(cv_engine.get_db_path())
+        self.extraction_cache = self.create_extraction_cache()
+        self.corpus_index = CorpusIndex(self.extraction_cache)
+        self.duplicate_index = DuplicateIndex(self.database)
+        self.session_store = SessionStore(self.database, cv_engine.get_sessions_dir())
+        self.session_name = None  # name the current review was saved or opened as
+        self.duplicate_clusters = []  # groups of near-duplicates among the loaded CVs
+        self.duplicate_of = {}  # file path -> loaded CV it is a near-duplicate of
+        self.ingestion_engine = IngestionEngine()
+        self.filter_worker = None
+        self.filter_started_at = 0.0
+        # Rendered previews, with the CVs next to the current one prefetched
+        self.preview_cache = PreviewCache()
+        self.prefetch_worker = None
+        self.prefetch_pending = []
+        # Profile from start-up when CV_SHUFFLER_PROFILE names an output file
+        self.profile_path = stats.profile_from_env()
+        
+        # Watched folder: only new or changed files are rescanned
+        self.watched_folder = None
+        self.folder_fingerprints = FolderFingerprints(self.database)
+        self.watch_fingerprints = {}  # fingerprints to record as files are scored
+        self.folder_watcher = QFileSystemWatcher(self)
+        self.folder_watcher.directoryChanged.connect(self.on_watched_folder_changed)
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(2000)
+        self.rescan_timer.timeout.connect(self.rescan_watched_folder)
         self.initUI()
         
-    def create_db_connection(self):
-        """Create database connection with proper path handling"""
-        # Ensure data directory exists
-        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        
-        db_path = os.path.join(data_dir, 'cv_shuffler.db')
-        return sqlite3.connect(db_path)
+    def create_extraction_cache(self):
+        """Create the extracted text cache next to the main database"""
+        return ExtractionCache(cv_engine.get_cache_path())
         
     def initUI(self):
         self.setWindowTitle('CV Shuffler and Candidate Selector')
@@ -205,6 +365,19 @@ class CVShufflerApp(QMainWindow):
         self.load_keywords_btn.clicked.connect(self.load_keywords_from_category)
         keyword_layout.addWidget(self.load_keywords_btn)
         
+        # Keyword set selection
+        set_layout = QHBoxLayout()
+        set_layout.addWidget(QLabel("Keyword Set:"))
+        self.set_combo = QComboBox()
+        self.load_keyword_sets()
+        set_layout.addWidget(self.set_combo)
+        keyword_layout.addLayout(set_layout)
+        
+        # Load weighted keyword set button
+        self.load_set_btn = QPushButton("Load Weighted Keyword Set")
+        self.load_set_btn.clicked.connect(self.load_keyword_set)
+        keyword_layout.addWidget(self.load_set_btn)
+        
         # Custom keywords input
         keyword_input_layout = QHBoxLayout()
         keyword_input_layout.addWidget(QLabel("Custom Keywords:"))
@@ -215,24 +388,92 @@ class CVShufflerApp(QMainWindow):
         
         # Threshold input
         threshold_layout = QHBoxLayout()
-        threshold_layout.addWidget(QLabel("Match threshold:"))
+        self.threshold_label = QLabel("Match threshold:")
+        threshold_layout.addWidget(self.threshold_label)
         self.threshold_spin = QSpinBox()
         self.threshold_spin.setRange(1, 50)
         self.threshold_spin.setValue(5)
         threshold_layout.addWidget(self.threshold_spin)
         threshold_layout.addStretch()
+        threshold_layout.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1) * 2)
+        self.workers_spin.setValue(self.ingestion_engine.workers)
+        self.workers_spin.setToolTip("Number of processes used to extract and score CVs")
+        threshold_layout.addWidget(self.workers_spin)
         keyword_layout.addLayout(threshold_layout)
         
+        # Live threshold: dragging updates the count, list colours and
+        # optionally the selection straight from the sorted scores
+        live_threshold_layout = QHBoxLayout()
+        self.threshold_slider = QSlider(Qt.Horizontal)
+        self.threshold_slider.setRange(1, 50)
+        self.threshold_slider.setValue(5)
+        self.threshold_slider.valueChanged.connect(self.threshold_spin.setValue)
+        live_threshold_layout.addWidget(self.threshold_slider)
+        self.threshold_count_label = QLabel()
+        live_threshold_layout.addWidget(self.threshold_count_label)
+        self.live_select_check = QCheckBox("Live selection")
+        self.live_select_check.setToolTip("Keep the selected candidates in step with the threshold; "
+                                          "selecting by hand turns this off")
+        self.live_select_check.toggled.connect(self.on_live_selection_toggled)
+        live_threshold_layout.addWidget(self.live_select_check)
+        keyword_layout.addLayout(live_threshold_layout)
+        self.score_histogram = ScoreHistogram()
+        keyword_layout.addWidget(self.score_histogram)
+        
+        # Ranking by keyword counts or BM25 relevance
+        ranking_layout = QHBoxLayout()
+        ranking_layout.addWidget(QLabel("Ranking:"))
+        self.ranking_combo = QComboBox()
+        self.ranking_combo.addItem("Keyword counts")
+        self.ranking_combo.addItem("Relevance (BM25)")
+        self.ranking_combo.setToolTip("Relevance ranks by BM25, which allows for CV length and common synonyms "
+                                      "(e.g. k8s and Kubernetes); the threshold becomes a percentage of the best CV")
+        self.ranking_combo.currentIndexChanged.connect(self.on_ranking_changed)
+        ranking_layout.addWidget(self.ranking_combo)
+        self.job_description_btn = QPushButton("Rank by Job Description...")
+        self.job_description_btn.clicked.connect(self.enter_job_description)
+        ranking_layout.addWidget(self.job_description_btn)
+        keyword_layout.addLayout(ranking_layout)
+        
         # Case sensitivity
         self.case_sensitive_check = QCheckBox("Case sensitive matching")
         keyword_layout.addWidget(self.case_sensitive_check)
         
+        # Early exit for long PDFs
+        early_exit_layout = QHBoxLayout()
+        self.early_exit_check = QCheckBox("Stop reading PDFs once the threshold is reached")
+        self.early_exit_check.setToolTip("Faster for long CVs, but match counts become lower bounds "
+                                         "and the text is not cached")
+        early_exit_layout.addWidget(self.early_exit_check)
+        early_exit_layout.addWidget(QLabel("Max pages:"))
+        self.max_pages_spin = QSpinBox()
+        self.max_pages_spin.setRange(0, 1000)
+        self.max_pages_spin.setSpecialValueText("All")
+        early_exit_layout.addWidget(self.max_pages_spin)
+        keyword_layout.addLayout(early_exit_layout)
+        
         # Apply keywords button
         self.apply_keywords_btn = QPushButton("Apply Keyword Filter")
         self.apply_keywords_btn.clicked.connect(self.apply_keyword_filter)
         self.apply_keywords_btn.setEnabled(False)
         keyword_layout.addWidget(self.apply_keywords_btn)
         
+        # Filter progress (shown while a filter run is active)
+        progress_layout = QHBoxLayout()
+        self.filter_progress = QProgressBar()
+        progress_layout.addWidget(self.filter_progress)
+        self.cancel_filter_btn = QPushButton("Cancel")
+        self.cancel_filter_btn.clicked.connect(self.cancel_keyword_filter)
+        progress_layout.addWidget(self.cancel_filter_btn)
+        keyword_layout.addLayout(progress_layout)
+        self.filter_rate_label = QLabel()
+        keyword_layout.addWidget(self.filter_rate_label)
+        self.filter_progress.hide()
+        self.cancel_filter_btn.hide()
+        self.filter_rate_label.hide()
+        
         # Auto-select button
         self.auto_select_btn = QPushButton("Auto-Select Matching CVs")
         self.auto_select_btn.clicked.connect(self.auto_select_matching)
@@ -249,16 +490,68 @@ class CVShufflerApp(QMainWindow):
         self.shuffle_btn.clicked.connect(self.shuffle_cvs)
         self.shuffle_btn.setEnabled(False)
         
+        self.screen_folder_btn = QPushButton("Screen Folder")
+        self.screen_folder_btn.setToolTip("Scan a folder and its subfolders with the current keywords")
+        self.screen_folder_btn.clicked.connect(self.screen_folder)
+        
         btn_layout.addWidget(self.load_btn)
+        btn_layout.addWidget(self.screen_folder_btn)
         btn_layout.addWidget(self.shuffle_btn)
         left_layout.addLayout(btn_layout)
         
+        # Watched folder buttons
+        watch_btn_layout = QHBoxLayout()
+        self.watch_btn = QPushButton("Watch Folder")
+        self.watch_btn.setToolTip("Screen a folder and rescan only new or changed CVs when it changes")
+        self.watch_btn.clicked.connect(self.watch_folder)
+        self.rescan_btn = QPushButton("Rescan Watched Folder")
+        self.rescan_btn.clicked.connect(self.rescan_watched_folder)
+        self.rescan_btn.setEnabled(False)
+        
+        watch_btn_layout.addWidget(self.watch_btn)
+        watch_btn_layout.addWidget(self.rescan_btn)
+        left_layout.addLayout(watch_btn_layout)
+        
+        # Review session buttons
+        session_btn_layout = QHBoxLayout()
+        self.save_session_btn = QPushButton("Save Session")
+        self.save_session_btn.setToolTip("Save the CV list, scores and selection to pick the review up later")
+        self.save_session_btn.clicked.connect(self.save_session)
+        self.open_session_btn = QPushButton("Open Session")
+        self.open_session_btn.clicked.connect(self.open_session)
+        
+        session_btn_layout.addWidget(self.save_session_btn)
+        session_btn_layout.addWidget(self.open_session_btn)
+        left_layout.addLayout(session_btn_layout)
+        
         # CV list with match counts
         left_layout.addWidget(QLabel("CV Files (Match Count):"))
-        self.cv_list = QListWidget()
-        self.cv_list.itemSelectionChanged.connect(self.show_cv_preview)
+        self.cv_model = CVListModel(self)
+        self.cv_proxy = CVFilterProxyModel(self)
+        self.cv_proxy.setSourceModel(self.cv_model)
+        self.cv_list = QListView()
+        self.cv_list.setModel(self.cv_proxy)
+        self.cv_list.setUniformItemSizes(True)
+        self.cv_list.selectionModel().currentChanged.connect(lambda current, previous: self.show_cv_preview())
         left_layout.addWidget(self.cv_list)
         
+        # List sorting and filtering
+        list_options_layout = QHBoxLayout()
+        self.sort_by_score_check = QCheckBox("Sort by score")
+        self.sort_by_score_check.toggled.connect(self.cv_proxy.set_sort_by_score)
+        list_options_layout.addWidget(self.sort_by_score_check)
+        self.hide_below_threshold_check = QCheckBox("Hide CVs below threshold")
+        self.hide_below_threshold_check.toggled.connect(self.update_list_filter)
+        list_options_layout.addWidget(self.hide_below_threshold_check)
+        self.collapse_duplicates_check = QCheckBox("Collapse duplicates")
+        self.collapse_duplicates_check.setToolTip("Show only the highest scoring of CVs that were received more than once")
+        self.collapse_duplicates_check.toggled.connect(self.cv_proxy.set_collapse_duplicates)
+        self.collapse_duplicates_check.toggled.connect(self.refresh_threshold)
+        self.collapse_duplicates_check.setChecked(True)
+        list_options_layout.addWidget(self.collapse_duplicates_check)
+        left_layout.addLayout(list_options_layout)
+        self.threshold_spin.valueChanged.connect(self.on_threshold_changed)
+        
         # Selection buttons
         select_btn_layout = QHBoxLayout()
         self.select_btn = QPushButton("Select Candidate")
@@ -272,10 +565,31 @@ class CVShufflerApp(QMainWindow):
         select_btn_layout.addWidget(self.deselect_btn)
         left_layout.addLayout(select_btn_layout)
         
+        # Bulk selection by score range, folder or file name
+        bulk_layout = QHBoxLayout()
+        self.bulk_combo = QComboBox()
+        self.bulk_combo.addItems(["Score range", "Folder", "File name regex"])
+        self.bulk_combo.currentIndexChanged.connect(self.on_bulk_criterion_changed)
+        bulk_layout.addWidget(self.bulk_combo)
+        self.bulk_input = QLineEdit()
+        bulk_layout.addWidget(self.bulk_input)
+        self.bulk_select_btn = QPushButton("Select Matching")
+        self.bulk_select_btn.clicked.connect(lambda: self.bulk_update_selection(True))
+        bulk_layout.addWidget(self.bulk_select_btn)
+        self.bulk_deselect_btn = QPushButton("Deselect Matching")
+        self.bulk_deselect_btn.clicked.connect(lambda: self.bulk_update_selection(False))
+        bulk_layout.addWidget(self.bulk_deselect_btn)
+        left_layout.addLayout(bulk_layout)
+        self.on_bulk_criterion_changed(0)
+        
         # Selected candidates
         left_layout.addWidget(QLabel("Selected Candidates:"))
-        self.selected_list = QListWidget()
+        self.selected_list = QListView()
+        self.selected_list.setModel(self.selection)
+        self.selected_list.setUniformItemSizes(True)
         left_layout.addWidget(self.selected_list)
+        for signal in (self.selection.rowsInserted, self.selection.rowsRemoved, self.selection.modelReset):
+            signal.connect(lambda *args: self.export_btn.setEnabled(bool(self.selection)))
         
         # Export button
         self.export_btn = QPushButton("Export Selected Candidates")
@@ -290,12 +604,15 @@ class CVShufflerApp(QMainWindow):
         # Create tabs
         self.tabs = QTabWidget()
         
-        # CV Preview tab - using QWebEngineView for proper rendering
+        # CV Preview tab - using QWebEngineView for proper rendering, created
+        # on the first preview (see preview_widget)
         preview_tab = QWidget()
-        preview_layout = QVBoxLayout(preview_tab)
-        preview_layout.addWidget(QLabel("CV Preview (Original Format):"))
-        self.preview_view = QWebEngineView()
-        preview_layout.addWidget(self.preview_view)
+        self.preview_layout = QVBoxLayout(preview_tab)
+        self.preview_layout.addWidget(QLabel("CV Preview (Original Format):"))
+        self.preview_view = None
+        self.preview_placeholder = QLabel("Select a CV to preview it.")
+        self.preview_placeholder.setAlignment(Qt.AlignCenter)
+        self.preview_layout.addWidget(self.preview_placeholder, 1)
         self.tabs.addTab(preview_tab, "CV Preview")
         
         # Text Content tab (for keyword extraction)
@@ -318,6 +635,44 @@ class CVShufflerApp(QMainWindow):
         analysis_layout.addWidget(self.keyword_table)
         self.tabs.addTab(analysis_tab, "Keyword Analysis")
         
+        # Diagnostics tab: stage timings, counters and profiling
+        diagnostics_tab = QWidget()
+        diagnostics_layout = QVBoxLayout(diagnostics_tab)
+        diagnostics_btn_layout = QHBoxLayout()
+        refresh_stats_btn = QPushButton("Refresh")
+        refresh_stats_btn.clicked.connect(self.refresh_diagnostics)
+        diagnostics_btn_layout.addWidget(refresh_stats_btn)
+        reset_stats_btn = QPushButton("Reset")
+        reset_stats_btn.clicked.connect(self.reset_diagnostics)
+        diagnostics_btn_layout.addWidget(reset_stats_btn)
+        dump_stats_btn = QPushButton("Save as JSON...")
+        dump_stats_btn.clicked.connect(self.dump_diagnostics)
+        diagnostics_btn_layout.addWidget(dump_stats_btn)
+        self.profile_btn = QPushButton("Stop Profiling" if stats.profiler is not None else "Start Profiling")
+        self.profile_btn.setCheckable(True)
+        self.profile_btn.setChecked(stats.profiler is not None)
+        self.profile_btn.toggled.connect(self.toggle_profiling)
+        diagnostics_btn_layout.addWidget(self.profile_btn)
+        diagnostics_layout.addLayout(diagnostics_btn_layout)
+        
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        diagnostics_layout.addWidget(self.counters_label)
+        self.stats_table = QTableWidget()
+        self.stats_table.setColumnCount(7)
+        self.stats_table.setHorizontalHeaderLabels(
+            ["Stage", "Calls", "Total (s)", "Mean (ms)", "Max (ms)", "Calls/s", "Latency Histogram"])
+        self.stats_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.Stretch)
+        diagnostics_layout.addWidget(self.stats_table, 2)
+        diagnostics_layout.addWidget(QLabel("Profile (GUI thread, by cumulative time):"))
+        self.profile_view = QTextEdit()
+        self.profile_view.setReadOnly(True)
+        self.profile_view.setFont(QFont("Courier", 9))
+        diagnostics_layout.addWidget(self.profile_view, 1)
+        self.tabs.addTab(diagnostics_tab, "Diagnostics")
+        self.diagnostics_tab = diagnostics_tab
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
         right_layout.addWidget(self.tabs)
         
         # Add panels to main layout
@@ -325,12 +680,12 @@ class CVShufflerApp(QMainWindow):
         main_layout.addWidget(right_panel, 2)
         
         # Status bar
+        self.cache_status_label = QLabel(self.extraction_cache.status_text())
+        self.statusBar().addPermanentWidget(self.cache_status_label)
         self.statusBar().showMessage('Ready')
         
     def load_categories(self):
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT id, name FROM job_categories ORDER BY name")
-        categories = cursor.fetchall()
+        categories = self.database.query("SELECT id, name FROM job_categories ORDER BY name")
         
         self.category_combo.clear()
         self.category_combo.addItem("Select a category", None)
@@ -343,22 +698,138 @@ class CVShufflerApp(QMainWindow):
             QMessageBox.warning(self, "Selection Error", "Please select a job category first.")
             return
             
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT keyword FROM keywords WHERE category_id = ? ORDER BY keyword", (category_id,))
-        keywords = cursor.fetchall()
+        keywords = self.database.query("SELECT keyword FROM keywords WHERE category_id = ? ORDER BY keyword",
+                                       (category_id,))
         
         keyword_list = [keyword[0] for keyword in keywords]
         self.keyword_input.setText(", ".join(keyword_list))
+        self.keyword_weights = {}
         self.apply_keywords_btn.setEnabled(True)
         
         self.statusBar().showMessage(f"Loaded {len(keyword_list)} keywords from {self.category_combo.currentText()}")
     
+    def load_keyword_sets(self):
+        keyword_sets = self.database.query("SELECT id, name FROM keyword_sets ORDER BY name")
+        
+        self.set_combo.clear()
+        self.set_combo.addItem("Select a keyword set", None)
+        for set_id, set_name in keyword_sets:
+            self.set_combo.addItem(set_name, set_id)
+    
+    def load_keyword_set(self):
+        set_id = self.set_combo.currentData()
+        if not set_id:
+            QMessageBox.warning(self, "Selection Error", "Please select a keyword set first.")
+            return
+            
+        weighted_keywords = self.database.query("""SELECT k.keyword, m.weight FROM keyword_set_mappings m
+                                                   JOIN keywords k ON k.id = m.keyword_id
+                                                   WHERE m.set_id = ? ORDER BY m.weight DESC, k.keyword""", (set_id,))
+        
+        if not weighted_keywords:
+            QMessageBox.warning(self, "Empty Set", "This keyword set has no keywords yet. "
+                                "Add some in the keyword manager.")
+            return
+            
+        self.keyword_weights = dict(weighted_keywords)
+        keywords = list(self.keyword_weights)
+        self.keyword_input.setText(", ".join(keywords))
+        self.apply_keywords_btn.setEnabled(True)
+        
+        # Re-rank from the stored counts when they cover every keyword
+        set_name = self.set_combo.currentText()
+        # Counts cut short by early exit were only enough for the scanned
+        # weights, so those results are screened again instead
+        if (self.filter_worker is None and self.results and self.results.covers(keywords)
+                and self.scan_threshold is None):
+            self.rescore(keywords)
+            self.statusBar().showMessage(f"Re-ranked {len(self.results)} CVs using keyword set {set_name}")
+        else:
+            self.statusBar().showMessage(f"Loaded {len(keywords)} weighted keywords from {set_name}")
+    
+    @stats.instrument("ui.rescore")
+    def rescore(self, keywords):
+        """Recompute scores and refresh the list.
+        
+        Scores are weighted keyword counts from the result store, or BM25
+        relevance once the ranking index of the scored CVs is built.
+        """
+        self.scored_keywords = keywords
+        if self.relevance_mode():
+            if self.ranking_index is not None and self.ranking_index.path_set == self.results.rows.keys():
+                self.results.set_scores(self.ranking_index.relevance(self.job_description or keywords,
+                                                                     self.keyword_weights))
+                self.cv_model.set_score_label("relevance %")
+                self.cv_model.set_scores(self.results.score_dict())
+                self.update_duplicate_originals()
+                return
+            # Ranked by counts until the index is ready
+            self.start_ranking_index()
+        self.results.set_weights(keywords, self.keyword_weights)
+        self.cv_model.set_score_label("score" if self.keyword_weights else "matches")
+        self.cv_model.set_scores(self.results.score_dict())
+        # The best copy of a duplicate may have changed
+        self.update_duplicate_originals()
+        
+    def relevance_mode(self):
+        return self.ranking_combo.currentIndex() == 1
+        
+    def on_ranking_changed(self):
+        relevance = self.relevance_mode()
+        self.threshold_label.setText("Min relevance %:" if relevance else "Match threshold:")
+        self.threshold_spin.setRange(1, 100 if relevance else 50)
+        self.update_threshold_slider()
+        # Early exit stops at a match count, which relevance doesn't have
+        self.early_exit_check.setEnabled(not relevance)
+        if self.results and self.filter_worker is None:
+            self.rescore(self.scored_keywords)
+            
+    def enter_job_description(self):
+        text, ok = QInputDialog.getMultiLineText(self, "Job Description",
+                                                 "Paste a job description to rank the CVs against:",
+                                                 self.job_description or "")
+        if not ok:
+            return
+        self.job_description = text.strip() or None
+        if self.job_description and not self.relevance_mode():
+            # Rescores through on_ranking_changed
+            self.ranking_combo.setCurrentIndex(1)
+        elif self.results and self.filter_worker is None:
+            self.rescore(self.scored_keywords)
+        if not self.results:
+            self.statusBar().showMessage("Apply the keyword filter to rank the CVs against the job description")
+            
+    def start_ranking_index(self):
+        """Build the ranking index of the scored CVs in the background"""
+        if self.ranking_worker is not None or not self.results:
+            return
+        self.ranking_worker = RankingIndexWorker(list(self.results), self.extraction_cache,
+                                                 self.corpus_index, parent=self)
+        self.ranking_worker.index_ready.connect(self.on_ranking_index_ready)
+        self.ranking_worker.start()
+        self.statusBar().showMessage(f"Building the relevance index of {len(self.results)} CVs...")
+        
+    def on_ranking_index_ready(self, ranking_index):
+        self.ranking_worker.wait()
+        self.ranking_worker = None
+        if ranking_index is None:
+            return
+        self.ranking_index = ranking_index
+        if self.relevance_mode() and self.filter_worker is None:
+            self.rescore(self.scored_keywords)
+            threshold = self.threshold_spin.value()
+            relevant = len(self.results.at_least(threshold))
+            self.statusBar().showMessage(f"Ranked {len(self.results)} CVs by relevance; {relevant} are at "
+                                         f"least {threshold}% relevant")
+    
     def manage_keywords(self):
-        dialog = KeywordManagerDialog(self)
+        dialog = KeywordManagerDialog(self.database, self)
         dialog.exec_()
-        # Refresh categories in case new ones were added
+        # Refresh categories and sets in case new ones were added
         self.load_categories()
+        self.load_keyword_sets()
         
+    @stats.instrument("ui.load_cvs")
     def load_cvs(self):
         options = QFileDialog.Options()
         files, _ = QFileDialog.getOpenFileNames(
@@ -368,97 +839,324 @@ class CVShufflerApp(QMainWindow):
         )
         
         if files:
+            self.stop_watching()
             self.cv_files = files
             self.update_cv_list()
             self.shuffle_btn.setEnabled(True)
             self.apply_keywords_btn.setEnabled(True)
             self.statusBar().showMessage(f"Loaded {len(files)} CVs")
             
+    def save_session(self):
+        if not self.cv_files:
+            QMessageBox.warning(self, "No CVs", "Load some CVs before saving a session.")
+            return
+        name, ok = QInputDialog.getText(self, "Save Session", "Session name:", text=self.session_name or "")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name != self.session_name and name in self.session_store.names():
+            reply = QMessageBox.question(self, "Replace Session", f"Replace the saved session {name}?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+                
+        settings = {
+            "keyword_text": self.keyword_input.text(),
+            "weights": self.keyword_weights,
+            "case_sensitive": self.scored_case_sensitive,
+            "threshold": self.threshold_spin.value(),
+            "ranking": self.ranking_combo.currentIndex(),
+            "job_description": self.job_description,
+            "scan_threshold": self.scan_threshold,
+        }
+        session = ReviewSession(self.cv_files, self.results, self.keyword_offsets, self.offset_keywords,
+                                list(self.selection), settings)
+        try:
+            with stats.timer("session.save"):
+                self.session_store.save(name, session)
+            self.session_name = name
+            self.statusBar().showMessage(f"Saved session {name}: {len(self.cv_files)} CVs, "
+                                         f"{len(self.selection)} selected")
+        except Exception as e:
+            QMessageBox.critical(self, "Session Error", f"Could not save the session: {str(e)}")
+            
+    def open_session(self):
+        names = self.session_store.names()
+        if not names:
+            QMessageBox.information(self, "No Sessions", "No review sessions have been saved yet.")
+            return
+        name, ok = QInputDialog.getItem(self, "Open Session", "Session:", names, 0, False)
+        if not ok:
+            return
+            
+        start = time.perf_counter()
+        try:
+            session = self.session_store.load(name)
+        except Exception as e:
+            QMessageBox.critical(self, "Session Error", f"Could not open the session: {str(e)}")
+            return
+        stats.record("session.open", time.perf_counter() - start)
+        if session is None:
+            return
+            
+        self.stop_watching()
+        settings = session.settings
+        # Restore the controls without rescoring; the scores come with the session
+        for widget in (self.ranking_combo, self.threshold_spin, self.live_select_check):
+            widget.blockSignals(True)
+        self.keyword_input.setText(settings["keyword_text"])
+        self.live_select_check.setChecked(False)
+        self.ranking_combo.setCurrentIndex(settings["ranking"])
+        relevance = self.relevance_mode()
+        self.threshold_label.setText("Min relevance %:" if relevance else "Match threshold:")
+        self.threshold_spin.setRange(1, 100 if relevance else 50)
+        self.early_exit_check.setEnabled(not relevance)
+        self.threshold_spin.setValue(settings["threshold"])
+        for widget in (self.ranking_combo, self.threshold_spin, self.live_select_check):
+            widget.blockSignals(False)
+        self.scan_threshold = settings.get("scan_threshold")
+        self.update_threshold_slider()
+        if settings["case_sensitive"] is not None:
+            self.case_sensitive_check.setChecked(settings["case_sensitive"])
+            
+        self.keyword_weights = settings["weights"]
+        self.job_description = settings["job_description"]
+        self.results = session.results
+        self.keyword_offsets = session.keyword_offsets
+        self.offset_keywords = session.offset_keywords
+        self.scored_keywords = session.results.scored_keywords
+        self.scored_case_sensitive = settings["case_sensitive"]
+        self.ranking_index = None
+        self.cv_files = session.cv_files
+        self.update_cv_list()
+        if relevance and self.results:
+            self.cv_model.set_score_label("relevance %")
+            
+        self.selection.set_paths(session.selected)
+        self.session_name = name
+        self.shuffle_btn.setEnabled(bool(self.cv_files))
+        self.apply_keywords_btn.setEnabled(bool(self.cv_files))
+        self.auto_select_btn.setEnabled(bool(self.results))
+        self.statusBar().showMessage(f"Opened session {name}: {len(self.cv_files)} CVs, "
+                                     f"{len(self.selection)} selected "
+                                     f"({time.perf_counter() - start:.2f}s)")
+        
+    def screen_folder(self):
+        keywords = cv_engine.parse_keywords(self.keyword_input.text())
+        if not keywords:
+            QMessageBox.warning(self, "No Keywords", "Please enter some keywords to filter by.")
+            return
+            
+        folder = QFileDialog.getExistingDirectory(self, "Select CV Folder")
+        if not folder:
+            return
+            
+        # Files are discovered lazily while earlier ones are being scored, and
+        # added to the list as their results arrive
+        self.stop_watching()
+        self.cv_files = []
+        self.statusBar().showMessage(f"Screening {folder} with {len(keywords)} keywords...")
+        self.start_keyword_filter(discover_cv_files(folder), keywords)
+        
+    @stats.instrument("ui.update_cv_list")
     def update_cv_list(self):
-        self.cv_list.clear()
-        for file_path in self.cv_files:
-            file_name = os.path.basename(file_path)
-            item = QListWidgetItem(file_name)
-            item.setData(Qt.UserRole, file_path)
+        """Reload the list model from cv_files (only needed when the file set changes)"""
+        self.cv_model.set_files(self.cv_files)
+        self.cv_model.set_score_label("score" if self.keyword_weights else "matches")
+        self.cv_model.set_scores(self.results.score_dict())
+        # CVs signed in earlier runs are collapsed straight away
+        self.update_duplicates()
+        
+    @stats.instrument("dedup.group")
+    def update_duplicates(self):
+        """Group near-duplicates among the loaded CVs from their stored signatures"""
+        self.duplicate_clusters = self.duplicate_index.clusters(self.cv_files)
+        self.update_duplicate_originals()
+        
+    def update_duplicate_originals(self):
+        """Keep the highest scoring CV of each near-duplicate group (as the CLI does) and reapply the threshold"""
+        scores = {file_path: self.results.score(file_path) for group in self.duplicate_clusters
+                  for file_path in group if file_path in self.results}
+        self.duplicate_of = originals(self.duplicate_clusters, scores)
+        self.cv_model.set_duplicates(self.duplicate_of)
+        self.refresh_threshold()
+        
+    def update_list_filter(self):
+        if self.hide_below_threshold_check.isChecked():
+            self.cv_proxy.set_min_score(self.threshold_spin.value())
+        else:
+            self.cv_proxy.set_min_score(None)
+            
+    def refresh_threshold(self):
+        """Re-sort the scores after rescoring or regrouping duplicates and reapply the threshold"""
+        self.score_distribution = None
+        self.on_threshold_changed()
+        
+    def current_score_distribution(self):
+        if self.score_distribution is None:
+            exclude = self.duplicate_of if self.collapse_duplicates_check.isChecked() else {}
+            self.score_distribution = self.results.distribution(exclude)
+            self.score_histogram.set_histogram(*self.score_distribution.histogram)
+        return self.score_distribution
+        
+    @stats.instrument("ui.threshold")
+    def on_threshold_changed(self):
+        """Apply the threshold to the list, count and live selection without rescoring"""
+        threshold = self.threshold_spin.value()
+        self.threshold_slider.blockSignals(True)
+        self.threshold_slider.setValue(threshold)
+        self.threshold_slider.blockSignals(False)
+        self.update_list_filter()
+        self.cv_model.set_threshold(threshold)
+        self.score_histogram.set_threshold(threshold)
+        distribution = self.current_score_distribution()
+        limit = self.exact_threshold_limit()
+        if limit is not None and threshold > limit:
+            # CVs that stopped counting at the scan threshold may pass or fail
+            self.threshold_count_label.setText(f"Scores from {limit} up are lower bounds (early exit); "
+                                               f"apply the filter again")
+            return
+        if len(distribution):
+            self.threshold_count_label.setText(f"{distribution.count_at_least(threshold)} of "
+                                               f"{len(distribution)} CVs")
+        else:
+            self.threshold_count_label.setText("")
+        if self.live_select_check.isChecked():
+            self.sync_live_selection(distribution, threshold)
+            
+    def exact_threshold_limit(self):
+        """Return the highest threshold the scores decide exactly, or None if they are all exact.
+        
+        Early exit stops counting a CV once it reaches the scan threshold, so
+        scores from there up are lower bounds. Relevance scores come from the
+        full text.
+        """
+        if self.scan_threshold is None or self.relevance_mode():
+            return None
+        return self.scan_threshold
+        
+    def update_threshold_slider(self):
+        """Keep the slider (and the histogram's exact range) to the thresholds the scores decide"""
+        limit = self.exact_threshold_limit()
+        top = self.threshold_spin.maximum()
+        self.threshold_slider.blockSignals(True)
+        self.threshold_slider.setRange(1, top if limit is None else min(top, limit))
+        self.threshold_slider.setValue(self.threshold_spin.value())
+        self.threshold_slider.blockSignals(False)
+        self.score_histogram.set_lower_bound(limit)
             
-            # Show match count if available
-            if file_path in self.keyword_matches:
-                match_count = sum(self.keyword_matches[file_path].values())
-                item.setText(f"{file_name} ({match_count} matches)")
-                # Color code based on match count
-                if match_count >= 10:
-                    item.setBackground(QColor(200, 255, 200))  # Light green for high matches
-                elif match_count >= 5:
-                    item.setBackground(QColor(255, 255, 200))  # Light yellow for medium matches
+    def on_live_selection_toggled(self, checked):
+        # The selection may have been changed by hand since it was last live
+        self.live_distribution = None
+        if checked:
+            self.on_threshold_changed()
             
-            self.cv_list.addItem(item)
+    def sync_live_selection(self, distribution, threshold):
+        """Select the CVs at or above threshold, in descending score order.
+        
+        The live selection is always a prefix of the sorted CVs, so moving the
+        threshold only adds or removes the CVs between the old and new cut.
+        """
+        count = distribution.count_at_least(threshold)
+        if self.live_distribution is not distribution:
+            self.selection.clear()
+            self.live_distribution = distribution
+        selected = len(self.selection)
+        if count > selected:
+            self.selection.add_many(distribution.paths[selected:count])
+        else:
+            self.selection.truncate(count)
+        
+    def current_cv_path(self):
+        index = self.cv_list.currentIndex()
+        return index.data(Qt.UserRole) if index.isValid() else None
             
+    @stats.instrument("ui.shuffle_cvs")
     def shuffle_cvs(self):
-        random.shuffle(self.cv_files)
-        self.update_cv_list()
+        # Sorting by score would hide the new order
+        self.sort_by_score_check.setChecked(False)
+        self.cv_files = self.cv_model.shuffle()
+        self.cv_list.setCurrentIndex(self.cv_proxy.index(-1, 0))
         self.statusBar().showMessage("CVs shuffled")
         
+    @stats.instrument("ui.show_cv_preview")
     def show_cv_preview(self):
-        current_item = self.cv_list.currentItem()
-        if current_item:
-            file_path = current_item.data(Qt.UserRole)
+        file_path = self.current_cv_path()
+        if file_path:
             
-            # Display the original document format
-            if file_path.endswith('.pdf'):
+            # Display the original document format; DOCX and text files are
+            # rendered to HTML once and kept in the preview cache
+            html_content, content = self.preview_cache.load(file_path, self.extraction_cache)
+            if html_content is None:
                 # For PDF files, display directly in the web view
-                self.preview_view.setUrl(QUrl.fromLocalFile(file_path))
-            elif file_path.endswith('.docx'):
-                # For DOCX files, convert to HTML for display
-                try:
-                    doc = Document(file_path)
-                    html_content = "<div style='font-family: Arial, sans-serif; padding: 20px;'>"
-                    for para in doc.paragraphs:
-                        if para.text.strip():  # Only add non-empty paragraphs
-                            html_content += f"<p>{para.text}</p>"
-                    html_content += "</div>"
-                    
-                    self.preview_view.setHtml(html_content)
-                except Exception as e:
-                    self.preview_view.setHtml(f"<h3>Error displaying DOCX file: {str(e)}</h3>")
+                self.preview_widget().setUrl(QUrl.fromLocalFile(file_path))
             else:
-                # For text files, display as HTML with monospace font
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    html_content = f"<pre style='font-family: monospace; padding: 20px;'>{content}</pre>"
-                    self.preview_view.setHtml(html_content)
-                except Exception as e:
-                    self.preview_view.setHtml(f"<h3>Error displaying text file: {str(e)}</h3>")
-            
-            # Extract text for keyword analysis
-            content = self.extract_text_from_cv(file_path)
+                self.preview_widget().setHtml(html_content)
+            
+            # Extracted text for keyword analysis
             self.text_view.setPlainText(content)
+            self.cache_status_label.setText(self.extraction_cache.status_text())
             self.select_btn.setEnabled(True)
             self.deselect_btn.setEnabled(True)
             
             # Update keyword analysis tab if keywords were applied
-            if file_path in self.keyword_matches:
+            if file_path in self.results:
                 self.update_keyword_table(file_path, content)
+                
+            # Near-duplicates received before that aren't loaded now
+            earlier = [path for path, _ in self.duplicate_index.find_similar(file_path)
+                       if path not in self.cv_model.rows]
+            if earlier:
+                self.statusBar().showMessage(f"Near-duplicate of a CV received before: {earlier[0]}"
+                                             + (f" and {len(earlier) - 1} more" if len(earlier) > 1 else ""))
+                
+            self.prefetch_neighbours()
     
-    def extract_text_from_cv(self, file_path):
-        text = ""
-        try:
-            if file_path.endswith('.pdf'):
-                with open(file_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-            elif file_path.endswith('.docx'):
-                doc = Document(file_path)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:  # Assume text file
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    text = file.read()
-        except Exception as e:
-            text = f"Error reading file: {str(e)}"
+    def preview_widget(self):
+        """Return the preview web view, creating it the first time it is needed.
+
+        Importing QtWebEngine takes longer than the rest of start-up together.
+        """
+        if self.preview_view is None:
+            from PyQt5.QtWebEngineWidgets import QWebEngineView
+            self.preview_view = QWebEngineView()
+            self.preview_layout.replaceWidget(self.preview_placeholder, self.preview_view)
+            self.preview_placeholder.deleteLater()
+        return self.preview_view
+    
+    def record_startup(self):
+        """Record the time from the start of the import to the first idle event loop"""
+        seconds = time.perf_counter() - STARTED_AT
+        stats.record("startup", seconds)
+        self.statusBar().showMessage(f"Ready in {seconds:.2f}s", 5000)
+    
+    def prefetch_neighbours(self):
+        """Render the previews of the CVs above and below the current one in the background"""
+        row = self.cv_list.currentIndex().row()
+        neighbours = [self.cv_proxy.index(row + step, 0).data(Qt.UserRole) for step in (1, -1)]
+        self.prefetch_pending = [fp for fp in neighbours if fp and self.preview_cache.lookup(fp) is None]
+        if self.prefetch_pending and self.prefetch_worker is None:
+            self.start_prefetch()
             
-        return text if text else "No text could be extracted from this file."
+    def start_prefetch(self):
+        file_paths, self.prefetch_pending = self.prefetch_pending, []
+        self.prefetch_worker = PreviewPrefetchWorker(self.preview_cache, file_paths,
+                                                     self.extraction_cache, parent=self)
+        self.prefetch_worker.finished.connect(self.on_prefetch_finished)
+        self.prefetch_worker.start()
+        
+    def on_prefetch_finished(self):
+        self.prefetch_worker.wait()
+        self.prefetch_worker = None
+        # The user may have moved on while this batch was rendering
+        if self.prefetch_pending:
+            self.start_prefetch()
+    
+    @stats.instrument("ui.extract_text_from_cv")
+    def extract_text_from_cv(self, file_path):
+        text = cv_engine.extract_text(file_path, self.extraction_cache)
+        self.cache_status_label.setText(self.extraction_cache.status_text())
+        return text
     
     def apply_keyword_filter(self):
         keywords_text = self.keyword_input.text().strip()
@@ -467,234 +1165,472 @@ class CVShufflerApp(QMainWindow):
             return
             
         # Parse keywords
-        keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
-        case_sensitive = self.case_sensitive_check.isChecked()
-        threshold = self.threshold_spin.value()
+        keywords = cv_engine.parse_keywords(keywords_text)
         
         self.statusBar().showMessage(f"Applying {len(keywords)} keywords to {len(self.cv_files)} CVs...")
+        self.start_keyword_filter(list(self.cv_files), keywords)
         
-        # Process each CV for keyword matches
-        self.keyword_matches = {}
-        for file_path in self.cv_files:
-            content = self.extract_text_from_cv(file_path)
-            self.keyword_matches[file_path] = self.find_keyword_matches(content, keywords, case_sensitive)
+    def start_keyword_filter(self, file_paths, keywords, incremental=False):
+        """Score file_paths (a list, or a lazy generator of unknown length).
         
-        # Update the list to show match counts
-        self.update_cv_list()
+        An incremental run keeps the results of CVs that are not rescored.
+        """
+        case_sensitive = self.case_sensitive_check.isChecked()
         
-        # Count CVs that meet the threshold
-        matching_cvs = [fp for fp in self.cv_files if sum(self.keyword_matches[fp].values()) >= threshold]
-        self.statusBar().showMessage(f"Found {len(matching_cvs)} CVs with at least {threshold} keyword matches")
-        self.auto_select_btn.setEnabled(True)
+        # Extract and score CVs on a worker thread (which fans out to the
+        # process pool), updating the list as each chunk of results arrives
+        if not incremental:
+            self.results = ResultStore(keywords, self.keyword_weights)
+            self.keyword_offsets = {}
+            self.update_cv_list()
+        else:
+            self.results.set_weights(keywords, self.keyword_weights)
+            # Rescanned CVs may have changed
+            self.ranking_index = None
+            if tuple(keywords) != self.offset_keywords:
+                self.keyword_offsets = {}
+        self.scored_keywords = keywords
+        self.offset_keywords = tuple(keywords)
+        self.scored_case_sensitive = case_sensitive
+        
+        stop_rule = {}
+        if self.early_exit_check.isChecked() and not self.relevance_mode():
+            stop_rule['threshold'] = self.threshold_spin.value()
+            stop_rule['weights'] = self.keyword_weights
+        # CVs kept from an earlier incremental run are exact up to their own scan's threshold
+        scan_thresholds = [threshold for threshold in (stop_rule.get('threshold'),
+                                                       self.scan_threshold if incremental else None)
+                           if threshold is not None]
+        self.scan_threshold = min(scan_thresholds) if scan_thresholds else None
+        self.update_threshold_slider()
+        if self.max_pages_spin.value():
+            stop_rule['max_pages'] = self.max_pages_spin.value()
+        self.ingestion_engine.set_workers(self.workers_spin.value())
+        self.filter_worker = KeywordFilterWorker(self.ingestion_engine, file_paths, keywords,
+                                                 case_sensitive, cache=self.extraction_cache,
+                                                 index=self.corpus_index, stop_rule=stop_rule,
+                                                 duplicates=self.duplicate_index, parent=self)
+        self.filter_worker.chunk_ready.connect(self.on_filter_chunk)
+        self.filter_worker.progress.connect(self.on_filter_progress)
+        self.filter_worker.failed.connect(self.on_filter_failed)
+        self.filter_worker.run_finished.connect(self.on_filter_finished)
+        # A range of (0, 0) shows a busy indicator while streaming a folder
+        self.filter_progress.setRange(0, len(file_paths) if isinstance(file_paths, list) else 0)
+        self.filter_progress.setValue(0)
+        self.filter_rate_label.setText("")
+        self.filter_started_at = time.monotonic()
+        self.set_filter_running(True)
+        self.filter_worker.start()
+        
+    def set_filter_running(self, running):
+        self.filter_progress.setVisible(running)
+        self.cancel_filter_btn.setVisible(running)
+        self.cancel_filter_btn.setEnabled(running)
+        self.filter_rate_label.setVisible(running)
+        self.apply_keywords_btn.setEnabled(not running and bool(self.cv_files))
+        self.load_btn.setEnabled(not running)
+        self.screen_folder_btn.setEnabled(not running)
+        self.watch_btn.setEnabled(not running)
+        self.rescan_btn.setEnabled(not running and self.watched_folder is not None)
+        self.save_session_btn.setEnabled(not running)
+        self.open_session_btn.setEnabled(not running)
+        
+    def cancel_keyword_filter(self):
+        if self.filter_worker is not None:
+            self.filter_worker.cancel()
+            self.cancel_filter_btn.setEnabled(False)
+            self.statusBar().showMessage("Cancelling keyword filter...")
+        
+    @stats.instrument("ui.on_filter_chunk")
+    def on_filter_chunk(self, chunk):
+        stats.add("files_scored", len(chunk))
+        new_files = []
+        for file_path, matches, offsets in chunk:
+            self.results.add(file_path, matches)
+            self.keyword_offsets[file_path] = offsets
+            if file_path not in self.cv_model.rows:
+                # Streamed from a folder scan
+                new_files.append(file_path)
+        self.score_distribution = None
+        if new_files:
+            self.cv_files.extend(new_files)
+            self.cv_model.append_files(new_files)
+        self.cv_model.update_scores({fp: self.results.score(fp) for fp, _, _ in chunk})
+        self.cache_status_label.setText(self.extraction_cache.status_text())
+        
+        # Remember which watched files are now up to date
+        scored = {fp: self.watch_fingerprints.pop(fp) for fp, _, _ in chunk if fp in self.watch_fingerprints}
+        if scored:
+            self.folder_fingerprints.record(self.watched_folder, scored)
+        
+    def on_filter_progress(self, processed, total):
+        elapsed = time.monotonic() - self.filter_started_at
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        if total:
+            self.filter_progress.setValue(processed)
+            eta = (total - processed) / rate if rate > 0 else 0.0
+            self.filter_rate_label.setText(f"{rate:.1f} CVs/s, ETA {eta:.0f}s")
+            self.statusBar().showMessage(f"Scored {processed} of {total} CVs...")
+        else:
+            self.filter_rate_label.setText(f"{rate:.1f} CVs/s")
+            self.statusBar().showMessage(f"Scored {processed} CVs...")
+        
+    def on_filter_failed(self, message):
+        QMessageBox.critical(self, "Filter Error", f"Keyword filtering stopped: {message}")
+        
+    def on_filter_finished(self, cancelled):
+        stats.record("filter.run", time.monotonic() - self.filter_started_at)
+        self.filter_worker.wait()
+        self.filter_worker = None
+        self.watch_fingerprints = {}
+        self.set_filter_running(False)
+        self.shuffle_btn.setEnabled(bool(self.cv_files))
+        self.rescore(self.scored_keywords)
+        self.update_duplicates()
+        self.auto_select_btn.setEnabled(bool(self.results))
+        if self.ranking_worker is not None:
+            # Reported once the relevance index is built
+            return
         
-    def find_keyword_matches(self, content, keywords, case_sensitive):
-        matches = {keyword: 0 for keyword in keywords}
+        # Count CVs that meet the threshold (only scored CVs when cancelled)
+        threshold = self.threshold_spin.value()
+        matching_cvs = self.results.at_least(threshold)
+        criterion = f"{threshold}% relevance" if self.relevance_mode() else f"{threshold} keyword matches"
+        duplicates = f" ({len(self.duplicate_of)} duplicates collapsed)" if self.duplicate_of else ""
+        if cancelled:
+            self.statusBar().showMessage(f"Filter cancelled after {len(self.results)} of "
+                                         f"{len(self.cv_files)} CVs; {len(matching_cvs)} have at "
+                                         f"least {criterion}{duplicates}")
+        else:
+            self.statusBar().showMessage(f"Found {len(matching_cvs)} CVs with at least {criterion}{duplicates}")
+        
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.diagnostics_tab:
+            self.refresh_diagnostics()
+        
+    def refresh_diagnostics(self):
+        snapshot = stats.snapshot()
+        derived = snapshot["derived"]
+        parts = [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        if derived["files_per_second"] is not None:
+            parts.append(f"files/s: {derived['files_per_second']:.1f}")
+        if derived["bytes_parsed_per_second"] is not None:
+            parts.append(f"parsed MB/s per worker: {derived['bytes_parsed_per_second'] / 1e6:.2f}")
+        for backend, bytes_per_second in derived["backend_bytes_per_second"].items():
+            parts.append(f"{backend} MB/s: {bytes_per_second / 1e6:.2f}")
+        parts.append(self.preview_cache.status_text())
+        self.counters_label.setText(", ".join(parts))
+        
+        self.stats_table.setRowCount(len(snapshot["stages"]))
+        for row, (stage, stage_stats) in enumerate(snapshot["stages"].items()):
+            histogram = "  ".join(f"{label}: {count}" for label, count in stage_stats["histogram"].items() if count)
+            per_second = stage_stats["per_second"]
+            values = [stage, str(stage_stats["count"]), f"{stage_stats['total_seconds']:.3f}",
+                      f"{stage_stats['mean_seconds'] * 1000:.2f}", f"{stage_stats['max_seconds'] * 1000:.2f}",
+                      f"{per_second:.1f}" if per_second is not None else "", histogram]
+            for column, value in enumerate(values):
+                self.stats_table.setItem(row, column, QTableWidgetItem(value))
+        
+    def reset_diagnostics(self):
+        stats.reset()
+        self.refresh_diagnostics()
+        
+    def dump_diagnostics(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Diagnostics", "cv_shuffler_stats.json",
+                                                   "JSON Files (*.json)")
+        if file_path:
+            try:
+                stats.dump_json(file_path)
+                self.statusBar().showMessage(f"Diagnostics saved to {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Save Error", f"Error saving diagnostics: {str(e)}")
         
-        if not case_sensitive:
-            content = content.lower()
+    def toggle_profiling(self, enabled):
+        if enabled:
+            stats.start_profile()
+            self.profile_btn.setText("Stop Profiling")
+            self.statusBar().showMessage("Profiling started")
+        else:
+            self.profile_view.setPlainText(stats.stop_profile(self.profile_path))
+            self.profile_btn.setText("Start Profiling")
+            self.statusBar().showMessage("Profiling stopped")
+        
+    def watch_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Watch")
+        if not folder:
+            return
             
-        for keyword in keywords:
-            search_term = keyword if case_sensitive else keyword.lower()
-            # Use regex to find whole word matches only
-            pattern = r'\b' + re.escape(search_term) + r'\b'
-            matches[keyword] = len(re.findall(pattern, content))
+        self.stop_watching()
+        self.watched_folder = folder
+        self.cv_files = []
+        self.results = ResultStore()
+        self.keyword_offsets = {}
+        self.scan_threshold = None
+        self.update_threshold_slider()
+        self.update_cv_list()
+        self.rescan_btn.setEnabled(True)
+        self.rescan_watched_folder()
+        
+    def stop_watching(self):
+        self.watched_folder = None
+        self.rescan_timer.stop()
+        if self.folder_watcher.directories():
+            self.folder_watcher.removePaths(self.folder_watcher.directories())
+        self.rescan_btn.setEnabled(False)
+        
+    def on_watched_folder_changed(self, path):
+        # Wait for file copies to settle before rescanning
+        self.rescan_timer.start()
+        
+    @stats.instrument("ui.rescan_watched_folder")
+    def rescan_watched_folder(self):
+        if self.watched_folder is None:
+            return
+        if self.filter_worker is not None:
+            # Try again once the current run has finished
+            self.rescan_timer.start()
+            return
             
-        return matches
-        
-    def update_keyword_table(self, file_path, content):
-        matches = self.keyword_matches[file_path]
-        
-        # Clear and setup table
-        self.keyword_table.setRowCount(len(matches))
-        
-        # Populate table with keyword matches
-        for row, (keyword, count) in enumerate(matches.items()):
-            self.keyword_table.setItem(row, 0, QTableWidgetItem(keyword))
-            self.keyword_table.setItem(row, 1, QTableWidgetItem(str(count)))
+        keywords = cv_engine.parse_keywords(self.keyword_input.text())
+        if not keywords:
+            self.statusBar().showMessage("Enter keywords to screen the watched folder")
+            return
             
-            # Find context for the keyword
-            context = self.find_keyword_context(content, keyword, 
-                                              self.case_sensitive_check.isChecked())
-            self.keyword_table.setItem(row, 2, QTableWidgetItem(context))
+        # Watch subfolders too, including ones created since the last scan
+        watched = set(self.folder_watcher.directories())
+        directories = [root for root, _, _ in os.walk(self.watched_folder)]
+        new_directories = [d for d in directories if d not in watched]
+        if new_directories:
+            self.folder_watcher.addPaths(new_directories)
             
-        # Sort by count descending
-        self.keyword_table.sortItems(1, Qt.DescendingOrder)
-        
-    def find_keyword_context(self, content, keyword, case_sensitive):
-        if not case_sensitive:
-            content = content.lower()
-            keyword = keyword.lower()
+        current, changed, deleted = self.folder_fingerprints.changes(self.watched_folder)
+        self.remove_cvs(deleted)
+        self.folder_fingerprints.forget(self.watched_folder, deleted)
+        
+        # New keywords mean every CV needs scoring again (unchanged ones are
+        # answered by the corpus index); otherwise only new or modified files
+        if (keywords != self.scored_keywords
+                or self.case_sensitive_check.isChecked() != self.scored_case_sensitive):
+            to_scan = list(current)
+        else:
+            changed = set(changed)
+            to_scan = [fp for fp in current if fp in changed or fp not in self.results]
             
-        # Find the first occurrence of the keyword
-        pos = content.find(keyword)
-        if pos == -1:
-            return "Not found"
+        if not to_scan:
+            if deleted:
+                self.rescore(self.scored_keywords)
+            self.statusBar().showMessage(f"Watched folder up to date: {len(self.cv_files)} CVs, "
+                                         f"{len(deleted)} removed")
+            return
+            
+        self.watch_fingerprints = {fp: current[fp] for fp in to_scan}
+        self.statusBar().showMessage(f"Scoring {len(to_scan)} CVs ({len(changed)} new or changed, "
+                                     f"{len(deleted)} removed)...")
+        self.start_keyword_filter(to_scan, keywords, incremental=True)
+        
+    def remove_cvs(self, file_paths):
+        """Drop CVs (e.g. deleted files) from the list, results and selection"""
+        removed = set(file_paths)
+        if not removed:
+            return
             
-        # Extract context around the keyword
-        start = max(0, pos - 40)
-        end = min(len(content), pos + len(keyword) + 40)
-        context = content[start:end]
+        self.cv_files = [fp for fp in self.cv_files if fp not in removed]
+        self.results.remove_many(removed)
+        for file_path in removed:
+            self.keyword_offsets.pop(file_path, None)
+        self.cv_model.remove_files(removed)
+        self.update_duplicates()
         
-        # Highlight the keyword in the context
-        if case_sensitive:
-            context = context.replace(keyword, f"[{keyword}]")
-        else:
-            # Case insensitive replacement
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            context = pattern.sub(r"[\g<0>]", context)
+        self.selection.remove_many(removed)
+        
+    def find_keyword_matches(self, content, keywords, case_sensitive):
+        return find_keyword_matches(content, keywords, case_sensitive)
+        
+    @stats.instrument("ui.update_keyword_table")
+    def update_keyword_table(self, file_path, content):
+        """List every occurrence of each keyword with its context, most frequent keywords first"""
+        keywords = self.scored_keywords
+        # The stored offsets are in the order of the keywords that were
+        # scanned, which a re-rank (e.g. another keyword set) can reorder or
+        # narrow; keywords that weren't scanned need a fresh search
+        offsets = self.keyword_offsets.get(file_path)
+        offset_keywords = self.offset_keywords
+        if offsets is None or not all(keyword in offset_keywords for keyword in keywords):
+            offsets = find_keyword_offsets(content, keywords, self.scored_case_sensitive)
+            offset_keywords = tuple(keywords)
+        columns = {keyword: i for i, keyword in enumerate(offset_keywords)}
+        counts = offsets.counts(offset_keywords)
+        # Offsets index the lowercased text when matching ignored case, which
+        # only differs in length from the original for a few characters
+        if not self.scored_case_sensitive and len(content.lower()) != len(content):
+            content = content.lower()
             
-        return context
+        rows = []
+        for keyword in sorted(keywords, key=lambda keyword: -counts[keyword]):
+            positions = offsets.positions(columns[keyword]).tolist()
+            contexts = cv_engine.keyword_contexts(content, positions, len(keyword))
+            for context in contexts or ["Not found"]:
+                rows.append((keyword, counts[keyword], context))
+                
+        self.keyword_table.setRowCount(len(rows))
+        for row, (keyword, count, context) in enumerate(rows):
+            self.keyword_table.setItem(row, 0, QTableWidgetItem(keyword))
+            self.keyword_table.setItem(row, 1, QTableWidgetItem(str(count)))
+            self.keyword_table.setItem(row, 2, QTableWidgetItem(context))
         
+    @stats.instrument("ui.auto_select_matching")
     def auto_select_matching(self):
+        self.live_select_check.setChecked(False)
         threshold = self.threshold_spin.value()
         
-        # Clear previous selections
-        self.selected_list.clear()
-        self.selected_candidates = []
-        
-        # Select all CVs that meet the threshold
-        for file_path in self.cv_files:
-            if sum(self.keyword_matches[file_path].values()) >= threshold:
-                file_name = os.path.basename(file_path)
-                item = QListWidgetItem(file_name)
-                item.setData(Qt.UserRole, file_path)
-                self.selected_list.addItem(item)
-                self.selected_candidates.append(file_path)
-        
-        if self.selected_candidates:
-            self.export_btn.setEnabled(True)
-            self.statusBar().showMessage(f"Auto-selected {len(self.selected_candidates)} candidates meeting the threshold")
+        # Replace the selection with all CVs that meet the threshold, skipping
+        # collapsed duplicates
+        matching = set(self.results.at_least(threshold))
+        if self.collapse_duplicates_check.isChecked():
+            matching.difference_update(self.duplicate_of)
+        self.selection.set_paths(file_path for file_path in self.cv_files if file_path in matching)
+        
+        limit = self.exact_threshold_limit()
+        if limit is not None and threshold > limit:
+            self.statusBar().showMessage(f"Auto-selected {len(self.selection)} candidates certain to meet the "
+                                         f"threshold; early exit stopped counting at {limit}, so apply the "
+                                         f"filter again to find the rest")
+        elif self.selection:
+            self.statusBar().showMessage(f"Auto-selected {len(self.selection)} candidates meeting the threshold")
         else:
             self.statusBar().showMessage("No candidates meet the threshold criteria")
     
     def select_candidate(self):
-        current_item = self.cv_list.currentItem()
-        if current_item:
-            file_path = current_item.data(Qt.UserRole)
+        file_path = self.current_cv_path()
+        if file_path:
+            self.live_select_check.setChecked(False)
             file_name = os.path.basename(file_path)
             
-            # Check if already selected
-            for i in range(self.selected_list.count()):
-                item = self.selected_list.item(i)
-                if item.data(Qt.UserRole) == file_path:
-                    QMessageBox.information(self, "Already Selected", 
-                                           "This candidate has already been selected.")
-                    return
-            
-            # Add to selected list
-            item = QListWidgetItem(file_name)
-            item.setData(Qt.UserRole, file_path)
-            self.selected_list.addItem(item)
-            self.selected_candidates.append(file_path)
-            self.export_btn.setEnabled(True)
+            if not self.selection.add(file_path):
+                QMessageBox.information(self, "Already Selected", 
+                                       "This candidate has already been selected.")
+                return
             self.statusBar().showMessage(f"Selected candidate: {file_name}")
             
     def deselect_candidate(self):
-        current_item = self.cv_list.currentItem()
-        if current_item:
-            file_path = current_item.data(Qt.UserRole)
+        file_path = self.current_cv_path()
+        if file_path:
+            self.live_select_check.setChecked(False)
             file_name = os.path.basename(file_path)
-            
-            # Remove from selected list
-            for i in range(self.selected_list.count()):
-                item = self.selected_list.item(i)
-                if item.data(Qt.UserRole) == file_path:
-                    self.selected_list.takeItem(i)
-                    self.selected_candidates.remove(file_path)
-                    break
-                    
-            if not self.selected_list.count():
-                self.export_btn.setEnabled(False)
-                
+            self.selection.remove(file_path)
             self.statusBar().showMessage(f"Removed candidate: {file_name}")
+            
+    def on_bulk_criterion_changed(self, index):
+        placeholders = ["Scores, e.g. 10-20, 10- or -5", "Folder (leave empty to browse)",
+                        "Regular expression, e.g. ^senior|lead"]
+        self.bulk_input.setPlaceholderText(placeholders[index])
+        
+    def bulk_matches(self):
+        """Return the CVs matching the bulk selection criterion, or None if it is invalid"""
+        criterion = self.bulk_combo.currentIndex()
+        text = self.bulk_input.text().strip()
+        try:
+            if criterion == 0:
+                low, high = parse_score_range(text)
+                return self.results.in_score_range(low, high)
+            if criterion == 1:
+                if not text:
+                    text = QFileDialog.getExistingDirectory(self, "Select Folder")
+                    if not text:
+                        return None
+                    self.bulk_input.setText(text)
+                return paths_in_folder(self.cv_files, text)
+            return paths_matching_name(self.cv_files, text)
+        except (ValueError, re.error) as e:
+            QMessageBox.warning(self, "Invalid Criterion", str(e))
+            return None
+            
+    @stats.instrument("ui.bulk_update_selection")
+    def bulk_update_selection(self, select):
+        matches = self.bulk_matches()
+        if matches is None:
+            return
+        self.live_select_check.setChecked(False)
+        if select:
+            if self.collapse_duplicates_check.isChecked():
+                matches = [file_path for file_path in matches if file_path not in self.duplicate_of]
+            added = self.selection.add_many(matches)
+            self.statusBar().showMessage(f"Selected {added} more candidates ({len(self.selection)} selected)")
+        else:
+            removed = self.selection.remove_many(matches)
+            self.statusBar().showMessage(f"Deselected {removed} candidates ({len(self.selection)} selected)")
                 
+    @stats.instrument("ui.export_selected")
     def export_selected(self):
-        if not self.selected_candidates:
+        if not self.selection:
             QMessageBox.warning(self, "No Selection", "No candidates have been selected.")
             return
             
         options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Save Selected Candidates", "", 
-            "CSV Files (*.csv);;Text Files (*.txt)", options=options
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save Selected Candidates", "", EXPORT_FILTER, options=options
         )
         
         if file_path:
+            # Take the extension from the chosen file type if none was typed
+            if not os.path.splitext(file_path)[1] and "(*." in selected_filter:
+                file_path += selected_filter[selected_filter.index("(*.") + 2:-1]
             try:
-                # Create a detailed report with keyword matches
-                data = []
-                for cv_path in self.selected_candidates:
-                    file_name = os.path.basename(cv_path)
-                    content_preview = self.extract_text_from_cv(cv_path)
-                    
-                    # Get keyword matches if available
-                    keyword_info = ""
-                    if cv_path in self.keyword_matches:
-                        matches = self.keyword_matches[cv_path]
-                        keyword_info = "; ".join([f"{k}:{v}" for k, v in matches.items() if v > 0])
-                    
-                    # Limit preview length
-                    if len(content_preview) > 200:
-                        content_preview = content_preview[:200] + "..."
-                    
-                    data.append({
-                        "File Name": file_name,
-                        "Path": cv_path,
-                        "Keyword Matches": keyword_info,
-                        "Preview": content_preview
-                    })
-                
-                df = pd.DataFrame(data)
-                
-                if file_path.endswith('.csv'):
-                    df.to_csv(file_path, index=False)
-                else:
-                    with open(file_path, 'w') as f:
-                        f.write(df.to_string(index=False))
+                # Stream a detailed report with keyword matches, reusing extracted text
+                scores = {fp: self.results.score(fp) for fp in self.selection if fp in self.results}
+                export_candidates(file_path, list(self.selection), self.results,
+                                  self.scored_keywords, scores, cache=self.extraction_cache,
+                                  index=self.corpus_index)
                     
                 QMessageBox.information(self, "Export Successful", 
                                        f"Selected candidates exported to {file_path}")
-                self.statusBar().showMessage(f"Exported {len(self.selected_candidates)} candidates to {file_path}")
+                self.statusBar().showMessage(f"Exported {len(self.selection)} candidates to {file_path}")
                 
             except Exception as e:
                 QMessageBox.critical(self, "Export Error", f"Error exporting data: {str(e)}")
                 self.statusBar().showMessage(f"Export error: {str(e)}")
     
     def closeEvent(self, event):
+        # Stop any running filter before tearing down the engine
+        if self.filter_worker is not None:
+            self.filter_worker.cancel()
+            self.filter_worker.wait()
+        if self.prefetch_worker is not None:
+            self.prefetch_worker.cancel()
+            self.prefetch_worker.wait()
+        if self.ranking_worker is not None:
+            self.ranking_worker.cancel()
+            self.ranking_worker.wait()
+        
         # Clean up temporary files
         for temp_file in self.temp_files:
             try:
                 os.unlink(temp_file)
             except:
                 pass
-        self.db_connection.close()
+        self.ingestion_engine.shutdown()
+        self.extraction_cache.close()
+        self.database.close()
+        if self.profile_path:
+            stats.stop_profile(self.profile_path)
         event.accept()
 
 def main():
     # Create application instance
     app = QApplication(sys.argv)
     
-    # Check if database exists, create if not
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-    db_path = os.path.join(data_dir, 'cv_shuffler.db')
-    
-    if not os.path.exists(db_path):
-        # Create database if it doesn't exist
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        
-        # Run the setup script
-        try:
-            import subprocess
-            subprocess.run([sys.executable, "setup_database.py"], check=True)
-        except:
-            # If setup script fails, show error
-            QMessageBox.critical(None, "Database Error", 
-                                "Could not create database. Please run setup_database.py manually.")
-            return
+    # Create the database schema if it isn't there yet (a quick check otherwise)
+    try:
+        setup_database(cv_engine.get_db_path())
+    except Exception as e:
+        QMessageBox.critical(None, "Database Error", 
+                            f"Could not create database: {str(e)}. Please run setup_database.py manually.")
+        return
     
     window = CVShufflerApp()
     window.show()
+    # Runs once the window is shown and the event loop is idle
+    QTimer.singleShot(0, window.record_startup)
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,134 @@
+"""Screen a directory of CVs from the command line, without starting the GUI.
+
+    python cv_shuffler_cli.py ./cvs --category "Technology & IT" --threshold 5 -o shortlist.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv_engine
+from corpus_index import CorpusIndex
+from database import Database
+from dedup import DuplicateIndex
+from export_engine import export_candidates
+from extraction_cache import ExtractionCache
+from ingestion import IngestionEngine
+from instrumentation import stats
+from setup_database import setup_database
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Screen CVs against keywords and write a report.")
+    parser.add_argument('directory', help="directory containing PDF, DOCX and TXT CVs")
+    keyword_source = parser.add_mutually_exclusive_group(required=True)
+    keyword_source.add_argument('--category', help="job category whose keywords to use")
+    keyword_source.add_argument('--keyword-set', help="weighted keyword set to use")
+    keyword_source.add_argument('--keywords', help="comma-separated keywords")
+    parser.add_argument('--threshold', type=int, default=5,
+                        help="minimum (weighted) match score to shortlist a CV, or with relevance "
+                             "ranking the minimum relevance in percent of the best CV (default: 5)")
+    parser.add_argument('--ranking', choices=['counts', 'relevance'], default='counts',
+                        help="shortlist by keyword counts or by BM25 relevance (default: counts)")
+    parser.add_argument('--job-description', metavar='FILE',
+                        help="rank by relevance to the job description in FILE instead of the keywords")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help="also screen CVs in subfolders (streamed, so any number of files)")
+    parser.add_argument('--case-sensitive', action='store_true')
+    parser.add_argument('--early-exit', action='store_true',
+                        help="stop reading a PDF once it reaches the threshold (counts become lower bounds)")
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help="read at most this many pages of each PDF")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of extraction processes (default: all cores)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="don't read or update the text cache and corpus index")
+    parser.add_argument('--skip-duplicates', action='store_true',
+                        help="leave out near-duplicates of a higher scoring CV (e.g. the same CV sent twice)")
+    parser.add_argument('--stats', metavar='FILE',
+                        help="write stage timings and counters for the run to FILE as JSON")
+    parser.add_argument('-o', '--output', default='shortlist.csv',
+                        help="report file: .csv, .jsonl, .parquet or .arrow (the last two need pyarrow "
+                             "and include a column per keyword); anything else for plain text")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+
+    setup_database(cv_engine.get_db_path())
+
+    database = Database(cv_engine.get_db_path())
+    weights = {}
+    if args.category:
+        keywords = cv_engine.load_category_keywords(database, args.category)
+    elif args.keyword_set:
+        weights = cv_engine.load_keyword_set(database, args.keyword_set)
+        keywords = list(weights)
+    else:
+        keywords = cv_engine.parse_keywords(args.keywords)
+
+    if not keywords:
+        database.close()
+        print("No keywords to screen with.", file=sys.stderr)
+        return 2
+
+    query = keywords
+    if args.job_description:
+        try:
+            with open(args.job_description, 'r', encoding='utf-8') as file:
+                query = file.read()
+        except OSError as e:
+            database.close()
+            print(f"Can't read the job description: {e}", file=sys.stderr)
+            return 2
+    relevance = args.ranking == 'relevance' or args.job_description is not None
+
+    file_paths = cv_engine.list_cv_files(args.directory, args.recursive)
+    cache = None if args.no_cache else ExtractionCache(cv_engine.get_cache_path())
+    index = None if cache is None else CorpusIndex(cache)
+    duplicates = DuplicateIndex(database) if args.skip_duplicates else None
+    engine = IngestionEngine(args.workers)
+
+    start = time.perf_counter()
+    profile_path = stats.profile_from_env()
+    try:
+        keyword_matches, scores = cv_engine.screen(file_paths, keywords, args.case_sensitive, weights,
+                                                   engine=engine, cache=cache, index=index,
+                                                   early_exit_threshold=(args.threshold if args.early_exit
+                                                                         and not relevance else None),
+                                                   max_pages=args.max_pages, duplicates=duplicates)
+        stats.record("filter.run", time.perf_counter() - start)
+        stats.add("files_scored", len(keyword_matches))
+        if relevance:
+            with stats.timer("ranking.build"):
+                scores = cv_engine.rank_relevance(list(keyword_matches), query, weights, cache=cache, index=index)
+        shortlisted = scores[scores >= args.threshold].sort_values(ascending=False, kind='stable')
+        if duplicates is not None:
+            # The highest scoring copy of each CV is kept
+            shortlisted = shortlisted.drop(list(duplicates.groups(shortlisted.index, shortlisted.to_dict())))
+        export_candidates(args.output, shortlisted.index, keyword_matches, keywords,
+                          scores.to_dict(), cache=cache, index=index)
+    finally:
+        if profile_path:
+            stats.stop_profile(profile_path)
+        engine.shutdown()
+        if cache is not None:
+            cache.close()
+        database.close()
+
+    print(f"Screened {len(keyword_matches)} CVs with {len(keywords)} keywords in "
+          f"{time.perf_counter() - start:.1f}s; {len(shortlisted)} with a "
+          f"{'relevance' if relevance else 'score'} of at least {args.threshold}"
+          f"{'%' if relevance else ''} written to {args.output}")
+    if args.stats:
+        stats.dump_json(args.stats)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
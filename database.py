@@ -0,0 +1,84 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class Database:
+    """Pooled access to an SQLite database, safe to use from any thread.
+
+    Connections are handed out one thread at a time and returned to the pool
+    afterwards, so the statement cache of each connection (sqlite3 prepares
+    every SQL string once per connection) survives between calls. The
+    database runs in WAL mode: readers never block the writer, so the GUI
+    can query while a background scan is storing results.
+    """
+
+    def __init__(self, db_path, pool_size=4, timeout=30.0):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def open_connection(self):
+        # Autocommit mode: transactions are only the ones begun explicitly
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                     check_same_thread=False, cached_statements=256)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def connect(self):
+        """Borrow a connection from the pool for the duration of the block"""
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        if connection is None:
+            connection = self.open_connection()
+        try:
+            yield connection
+        finally:
+            with self.lock:
+                if not self.closed and len(self.idle) < self.pool_size:
+                    self.idle.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run the block's statements in one write transaction, rolled back on error"""
+        with self.connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        with self.connect() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.connect() as connection:
+            return connection.execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        """Run one write statement in its own transaction and return the row count"""
+        with self.transaction() as connection:
+            return connection.execute(sql, params).rowcount
+
+    def executemany(self, sql, rows):
+        """Run a write statement for every row in a single transaction and return the row count"""
+        with self.transaction() as connection:
+            return connection.executemany(sql, rows).rowcount
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,226 @@
+"""Near-duplicate CV detection with MinHash signatures and LSH buckets.
+
+Each CV's text is reduced to a MinHash signature of its word shingles; the
+fraction of equal signature values estimates how similar two texts are.
+Signatures are split into bands and every band is hashed into a bucket, so
+CVs that are near-duplicates share a bucket with high probability and only
+CVs sharing a bucket are compared. Signatures and buckets are stored in
+cv_shuffler.db, so new CVs are checked against every CV seen before.
+"""
+import os
+import re
+import zlib
+
+import numpy as np
+
+from extraction_cache import ExtractionCache
+
+SHINGLE_WORDS = 3
+BANDS = 16
+ROWS = 4  # signature values per band
+NUM_HASHES = BANDS * ROWS
+# Estimated similarity from which two CVs count as duplicates. Pairs this
+# similar share a bucket with a probability of over 99.9%.
+SIMILARITY_THRESHOLD = 0.8
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2**64 >> 32 with odd a.
+# Fixed seed, since signatures are stored between runs.
+_random = np.random.RandomState(20240601)
+MULTIPLIERS = _random.randint(0, 2 ** 63, NUM_HASHES, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+OFFSETS = _random.randint(0, 2 ** 63, NUM_HASHES, dtype=np.uint64)
+SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def minhash_signature(text):
+    """Return the MinHash signature (uint32 array) of text's word shingles, or None if it has no words"""
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return None
+    # Each word is hashed once and shingles are combined from the word hashes,
+    # which is several times quicker than hashing the shingle strings
+    word_hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in words),
+                              dtype=np.uint64, count=len(words))
+    shingle_words = min(SHINGLE_WORDS, len(words))
+    count = len(words) - shingle_words + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for i in range(shingle_words):
+        shingles = shingles * SHINGLE_MULTIPLIER + word_hashes[i:i + count]
+    hashes = np.unique(shingles)
+    values = (MULTIPLIERS[:, None] * hashes[None, :] + OFFSETS[:, None]) >> np.uint64(32)
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """Return the bucket of each band of signature"""
+    return [zlib.crc32(band.tobytes()) for band in signature.reshape(BANDS, ROWS)]
+
+
+def similarity(signature, other):
+    """Estimate the Jaccard similarity of two CVs' shingles from their signatures"""
+    return float(np.count_nonzero(signature == other)) / NUM_HASHES
+
+
+class DuplicateIndex:
+    """MinHash signatures and LSH buckets of CV text stored in cv_shuffler.db"""
+
+    def __init__(self, database):
+        # A Database shared between the GUI thread and the filter worker thread
+        self.database = database
+        with database.transaction() as connection:
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS cv_signatures (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            )
+            ''')
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS cv_signature_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                path TEXT NOT NULL
+            )
+            ''')
+            connection.execute("CREATE INDEX IF NOT EXISTS cv_signature_buckets_bucket "
+                               "ON cv_signature_buckets (band, bucket)")
+            connection.execute("CREATE INDEX IF NOT EXISTS cv_signature_buckets_path ON cv_signature_buckets (path)")
+
+    def is_current(self, file_path):
+        """Return True if file_path has a signature for its current size and mtime"""
+        row = self.database.query_one("SELECT size, mtime_ns FROM cv_signatures WHERE path = ?",
+                                      (os.path.abspath(file_path),))
+        if row is None:
+            return False
+        try:
+            return ExtractionCache.fingerprint(file_path) == row
+        except OSError:
+            return False
+
+    def add_many(self, items):
+        """Sign (file_path, text) pairs that aren't signed yet and store them in one transaction"""
+        rows = []
+        for file_path, text in items:
+            if self.is_current(file_path):
+                continue
+            signature = minhash_signature(text)
+            if signature is None:
+                continue
+            try:
+                rows.append((os.path.abspath(file_path), *ExtractionCache.fingerprint(file_path), signature))
+            except OSError:
+                continue
+        if not rows:
+            return
+
+        with self.database.transaction() as connection:
+            for path, size, mtime_ns, signature in rows:
+                connection.execute("INSERT OR REPLACE INTO cv_signatures (path, size, mtime_ns, signature) "
+                                   "VALUES (?, ?, ?, ?)", (path, size, mtime_ns, signature.tobytes()))
+                connection.execute("DELETE FROM cv_signature_buckets WHERE path = ?", (path,))
+                connection.executemany("INSERT INTO cv_signature_buckets (band, bucket, path) VALUES (?, ?, ?)",
+                                       [(band, bucket, path) for band, bucket in enumerate(band_buckets(signature))])
+
+    def remove(self, file_path):
+        path = os.path.abspath(file_path)
+        with self.database.transaction() as connection:
+            connection.execute("DELETE FROM cv_signatures WHERE path = ?", (path,))
+            connection.execute("DELETE FROM cv_signature_buckets WHERE path = ?", (path,))
+
+    def get_signature(self, file_path):
+        row = self.database.query_one("SELECT signature FROM cv_signatures WHERE path = ?",
+                                      (os.path.abspath(file_path),))
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    def signatures(self, file_paths):
+        """Return {file_path: signature} for the file_paths that are signed"""
+        paths = {os.path.abspath(file_path): file_path for file_path in file_paths}
+        signatures = {}
+        path_list = list(paths)
+        # Stay below SQLite's limit on query parameters
+        for start in range(0, len(path_list), 500):
+            batch = path_list[start:start + 500]
+            rows = self.database.query(
+                f"SELECT path, signature FROM cv_signatures WHERE path IN ({', '.join('?' * len(batch))})", batch)
+            for path, signature in rows:
+                signatures[paths[path]] = np.frombuffer(signature, dtype=np.uint32)
+        return signatures
+
+    def find_similar(self, file_path):
+        """Return [(path, similarity)] of every CV seen before that is a near-duplicate of file_path"""
+        signature = self.get_signature(file_path)
+        if signature is None:
+            return []
+        path = os.path.abspath(file_path)
+        candidates = set()
+        for band, bucket in enumerate(band_buckets(signature)):
+            rows = self.database.query("SELECT path FROM cv_signature_buckets WHERE band = ? AND bucket = ?",
+                                       (band, bucket))
+            candidates.update(candidate for (candidate,) in rows if candidate != path)
+
+        similar = []
+        for candidate, other in self.signatures(candidates).items():
+            score = similarity(signature, other)
+            if score >= SIMILARITY_THRESHOLD:
+                similar.append((candidate, score))
+        return sorted(similar, key=lambda item: -item[1])
+
+    def clusters(self, file_paths):
+        """Return the groups of near-duplicates among file_paths, each in file_paths order.
+
+        Every pair of CVs sharing an LSH bucket is compared and the pairs at
+        or above SIMILARITY_THRESHOLD are joined with union-find, so a group
+        doesn't depend on the order of file_paths. Unsigned CVs are never
+        duplicates.
+        """
+        file_paths = list(file_paths)
+        signatures = self.signatures(file_paths)
+        parent = {}
+
+        def find(file_path):
+            while parent.get(file_path, file_path) != file_path:
+                file_path = parent[file_path]
+            return file_path
+
+        buckets = {}
+        for file_path in file_paths:
+            signature = signatures.get(file_path)
+            if signature is None:
+                continue
+            for key in enumerate(band_buckets(signature)):
+                buckets.setdefault(key, []).append(file_path)
+
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for other in members[i + 1:]:
+                    root, other_root = find(first), find(other)
+                    # Pairs already joined through other members need no comparison
+                    if root != other_root and similarity(signatures[first], signatures[other]) >= SIMILARITY_THRESHOLD:
+                        parent[other_root] = root
+
+        groups = {}
+        for file_path in file_paths:
+            if file_path in signatures:
+                groups.setdefault(find(file_path), []).append(file_path)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def groups(self, file_paths, scores=None):
+        """Return {file_path: original} for every near-duplicate among file_paths (see originals)"""
+        return originals(self.clusters(file_paths), scores)
+
+
+def originals(clusters, scores=None):
+    """Map every CV of each near-duplicate group to the one kept: the highest scoring.
+
+    scores is {file_path: score}; ties, and CVs without a score, go to the
+    earliest CV of the group.
+    """
+    scores = scores or {}
+    duplicate_of = {}
+    for group in clusters:
+        # max() returns the first of equal scores
+        original = max(group, key=lambda file_path: scores.get(file_path, 0))
+        duplicate_of.update((file_path, original) for file_path in group if file_path != original)
+    return duplicate_of
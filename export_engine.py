@@ -0,0 +1,190 @@
+"""Streaming export of screened candidates.
+
+Rows are produced one CV at a time and written as they come, so exports of
+tens of thousands of candidates don't build a table in memory. Previews use
+text that was already extracted (text cache or corpus index) when there is
+any; otherwise only as much of the file is read as the preview needs.
+
+Parquet and Arrow output need pyarrow, which is optional.
+"""
+import csv
+import json
+import os
+
+from ingestion import iter_cv_pages
+
+REPORT_COLUMNS = ["File Name", "Path", "Keyword Matches", "Preview"]
+
+PREVIEW_LENGTH = 200
+
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+}
+
+EXPORT_FILTER = ("CSV Files (*.csv);;JSON Lines (*.jsonl);;Parquet Files (*.parquet);;"
+                 "Arrow Files (*.arrow);;Text Files (*.txt)")
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_format(file_path):
+    """Return the export format for file_path's extension ('text' for anything unknown)"""
+    return EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower(), 'text')
+
+
+def known_text(file_path, cache=None, index=None):
+    """Return a CV's text if it was already extracted, without reading the file"""
+    text = cache.get(file_path) if cache is not None else None
+    if text is None and index is not None:
+        text = index.get_text(file_path)
+    return text
+
+
+def read_preview_text(file_path, length=PREVIEW_LENGTH):
+    """Read just enough of a CV to show a preview of length characters"""
+    pages = iter_cv_pages(file_path)
+    text = ""
+    try:
+        for page in pages:
+            text += page
+            if len(text) > length:
+                break
+    finally:
+        pages.close()
+    return text
+
+
+def preview(file_path, cache=None, index=None, length=PREVIEW_LENGTH):
+    """Return the export preview of a CV, matching cv_engine.extract_text's messages"""
+    text = known_text(file_path, cache, index)
+    if text is None:
+        try:
+            text = read_preview_text(file_path, length)
+        except Exception as e:
+            text = f"Error reading file: {str(e)}"
+    if not text:
+        text = "No text could be extracted from this file."
+
+    # Limit preview length
+    if len(text) > length:
+        text = text[:length] + "..."
+    return text
+
+
+def iter_report_rows(cv_paths, keyword_matches, cache=None, index=None):
+    """Yield one export row (a dict of REPORT_COLUMNS) per CV"""
+    for cv_path in cv_paths:
+        # Get keyword matches if available
+        keyword_info = ""
+        if cv_path in keyword_matches:
+            matches = keyword_matches[cv_path]
+            keyword_info = "; ".join([f"{k}:{v}" for k, v in matches.items() if v > 0])
+
+        yield {
+            "File Name": os.path.basename(cv_path),
+            "Path": cv_path,
+            "Keyword Matches": keyword_info,
+            "Preview": preview(cv_path, cache, index),
+        }
+
+
+def write_csv(rows, file_path):
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(rows, file_path):
+    count = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def write_text(rows, file_path):
+    """Write one block per candidate; a table would need every row to size its columns"""
+    count = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            if count:
+                f.write("\n")
+            for column in REPORT_COLUMNS:
+                value = " ".join(str(row[column]).split()) if column == "Preview" else row[column]
+                f.write(f"{column}: {value}\n")
+            count += 1
+    return count
+
+
+def write_columnar(rows, file_path, file_format, keyword_matches, keywords, scores=None, batch_size=5000):
+    """Write rows plus a score column and one count column per keyword as Parquet or Arrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError(f"{file_format.capitalize()} export needs pyarrow (pip install pyarrow)")
+
+    fields = [pa.field(column, pa.string()) for column in REPORT_COLUMNS]
+    fields.append(pa.field("Score", pa.float64()))
+    fields.extend(pa.field(keyword, pa.int32()) for keyword in keywords)
+    schema = pa.schema(fields)
+
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(file_path, schema)
+    else:
+        writer = pa.ipc.new_file(file_path, schema)
+
+    def write_batch(batch):
+        columns = [[row[column] for row in batch] for column in REPORT_COLUMNS]
+        columns.append([scores.get(row["Path"]) if scores is not None else None for row in batch])
+        # Each CV's counts are looked up once, not once per keyword
+        matches = [keyword_matches.get(row["Path"], {}) for row in batch]
+        for keyword in keywords:
+            columns.append([cv_matches.get(keyword, 0) for cv_matches in matches])
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    count = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+
+def export_candidates(file_path, cv_paths, keyword_matches, keywords=(), scores=None, cache=None, index=None):
+    """Stream an export of cv_paths to file_path in the format given by its extension.
+
+    keywords and scores ({file_path: score}) are used for the count matrix
+    and score columns of Parquet and Arrow exports. Returns the row count.
+    """
+    file_format = export_format(file_path)
+    rows = iter_report_rows(cv_paths, keyword_matches, cache, index)
+    # Column names must be unique
+    keywords = [k for k in dict.fromkeys(keywords) if k not in REPORT_COLUMNS and k != "Score"]
+    if file_format == 'csv':
+        return write_csv(rows, file_path)
+    if file_format == 'jsonl':
+        return write_jsonl(rows, file_path)
+    if file_format in ('parquet', 'arrow'):
+        return write_columnar(rows, file_path, file_format, keyword_matches, keywords, scores)
+    return write_text(rows, file_path)
@@ -0,0 +1,72 @@
+import os
+import threading
+
+from database import Database
+
+
+class ExtractionCache:
+    """On-disk cache of extracted CV text, invalidated when the file changes"""
+
+    def __init__(self, cache_path):
+        # Shared between the GUI thread and the filter worker thread
+        self.database = Database(cache_path)
+        self.database.execute('''
+        CREATE TABLE IF NOT EXISTS extracted_text (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            text TEXT NOT NULL
+        )
+        ''')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(file_path):
+        """Return the (size, mtime) pair used to detect changed files"""
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path):
+        """Return cached text for file_path, or None if missing or stale"""
+        try:
+            size, mtime_ns = self.fingerprint(file_path)
+            row = self.database.query_one("SELECT size, mtime_ns, text FROM extracted_text WHERE path = ?",
+                                          (os.path.abspath(file_path),))
+        except OSError:
+            row = None
+            size = mtime_ns = None
+
+        with self.lock:
+            if row is None or row[0] != size or row[1] != mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[2]
+
+    def put(self, file_path, text):
+        self.put_many([(file_path, text)])
+
+    def put_many(self, items):
+        """Store (file_path, text) pairs in one transaction"""
+        rows = []
+        for file_path, text in items:
+            try:
+                size, mtime_ns = self.fingerprint(file_path)
+            except OSError:
+                continue
+            rows.append((os.path.abspath(file_path), size, mtime_ns, text))
+        if rows:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete
+            # would skip the corpus index's triggers
+            self.database.executemany(
+                "INSERT INTO extracted_text (path, size, mtime_ns, text) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "text = excluded.text", rows)
+
+    def status_text(self):
+        return f"Text cache: {self.hits} hits, {self.misses} misses"
+
+    def close(self):
+        self.database.close()
@@ -0,0 +1,178 @@
+"""Text extractors for each CV format, chosen by the file's content.
+
+The format comes from the first bytes of the file, not its extension. Each
+format has a list of backends in order of preference; the optional ones
+(pypdfium2, pdfminer.six) are used when they are installed, and a backend
+that can't open a file falls back to the next. Backend libraries are
+imported on first use.
+"""
+import importlib.util
+import os
+import zipfile
+from xml.etree import ElementTree
+
+
+class Extractor:
+    """A named backend that yields a file's text page by page"""
+
+    def __init__(self, name, file_format, iter_pages, requires=None, in_process=False):
+        self.name = name
+        self.file_format = file_format
+        self.iter_pages = iter_pages
+        self.requires = requires  # module that must be importable, if any
+        # Cheaper to run in the calling process than to send to a worker
+        self.in_process = in_process
+        self._available = None
+
+    @property
+    def available(self):
+        if self._available is None:
+            self._available = self.requires is None or importlib.util.find_spec(self.requires) is not None
+        return self._available
+
+
+EXTRACTORS = {}  # format -> [Extractor] in order of preference
+
+
+def register_extractor(file_format, name, iter_pages, requires=None, in_process=False, preferred=False):
+    """Add a backend for file_format, ahead of the existing ones if preferred"""
+    extractor = Extractor(name, file_format, iter_pages, requires, in_process)
+    backends = EXTRACTORS.setdefault(file_format, [])
+    if preferred:
+        backends.insert(0, extractor)
+    else:
+        backends.append(extractor)
+    return extractor
+
+
+def available_extractors(file_format):
+    return [extractor for extractor in EXTRACTORS.get(file_format, []) if extractor.available]
+
+
+def extracts_in_process(file_path):
+    """Return True if file_path's preferred backend is cheaper than a round trip to a worker"""
+    extractors = available_extractors(detect_format(file_path))
+    return bool(extractors) and extractors[0].in_process
+
+
+def detect_format(file_path):
+    """Return 'pdf', 'docx' or 'txt' from the file's first bytes (the extension if it's empty)"""
+    try:
+        with open(file_path, 'rb') as file:
+            head = file.read(1024)
+    except OSError:
+        head = b""
+    if not head:
+        return os.path.splitext(file_path)[1].lower().lstrip('.') or 'txt'
+    # The PDF header may follow some junk within the first kilobyte
+    if b"%PDF-" in head:
+        return 'pdf'
+    if head.startswith(b"PK\x03\x04"):
+        return 'docx'
+    return 'txt'
+
+
+def open_pages(file_path, file_format=None, backend=None):
+    """Return (backend name, page iterator) from the first backend that opens file_path.
+
+    Opening reads the first page, so a backend that fails on the file is
+    skipped before anything is returned. backend forces a particular one.
+    """
+    file_format = file_format or detect_format(file_path)
+    extractors = available_extractors(file_format)
+    if backend is not None:
+        extractors = [extractor for extractor in extractors if extractor.name == backend]
+    error = None
+    for extractor in extractors:
+        pages = extractor.iter_pages(file_path)
+        try:
+            first = next(pages, None)
+        except Exception as e:
+            error = e
+            continue
+        return extractor.name, resume_pages(first, pages)
+    raise error or ValueError(f"No extractor available for {file_format} files")
+
+
+def resume_pages(first, pages):
+    try:
+        if first is not None:
+            yield first
+        yield from pages
+    finally:
+        pages.close()
+
+
+def pdfium_pages(file_path):
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        for page in pdf:
+            text_page = page.get_textpage()
+            yield text_page.get_text_range().replace("\r\n", "\n") + "\n"
+            text_page.close()
+            page.close()
+    finally:
+        pdf.close()
+
+
+def pdfminer_pages(file_path):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    for layout in extract_pages(file_path):
+        yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer)) + "\n"
+
+
+def pypdf2_pages(file_path):
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            yield page.extract_text() + "\n"
+
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+RUN_TEXT = {WORD_NAMESPACE + 'tab': "\t", WORD_NAMESPACE + 'br': "\n", WORD_NAMESPACE + 'cr': "\n"}
+
+
+def docx_xml_pages(file_path):
+    """Read the body paragraphs straight from word/document.xml, like python-docx's doc.paragraphs.
+
+    Only runs directly inside a paragraph count, as in python-docx's
+    paragraph.text; runs nested in hyperlinks, fields or text boxes are
+    skipped by both, so keyword counts don't depend on the backend.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        body = ElementTree.fromstring(archive.read('word/document.xml')).find(WORD_NAMESPACE + 'body')
+    paragraphs = []
+    for paragraph in body.iterfind(WORD_NAMESPACE + 'p'):
+        parts = []
+        for run in paragraph.iterfind(WORD_NAMESPACE + 'r'):
+            for element in run:
+                if element.tag == WORD_NAMESPACE + 't':
+                    parts.append(element.text or "")
+                else:
+                    parts.append(RUN_TEXT.get(element.tag, ""))
+        paragraphs.append("".join(parts) + "\n")
+    yield "".join(paragraphs)
+
+
+def python_docx_pages(file_path):
+    from docx import Document
+    doc = Document(file_path)
+    yield "".join(para.text + "\n" for para in doc.paragraphs)
+
+
+def text_pages(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        yield file.read()
+
+
+# pypdfium2 is several times faster than PyPDF2, pdfminer.six slower but more
+# tolerant of damaged files
+register_extractor('pdf', 'pypdfium2', pdfium_pages, requires='pypdfium2')
+register_extractor('pdf', 'pypdf2', pypdf2_pages, requires='PyPDF2')
+register_extractor('pdf', 'pdfminer', pdfminer_pages, requires='pdfminer')
+register_extractor('docx', 'docx-xml', docx_xml_pages)
+register_extractor('docx', 'python-docx', python_docx_pages, requires='docx')
+register_extractor('txt', 'text', text_pages, in_process=True)
@@ -0,0 +1,77 @@
+import os
+
+from ingestion import discover_cv_files
+
+
+class FolderFingerprints:
+    """Size and mtime of every CV in a watched folder, stored in cv_shuffler.db.
+
+    Comparing a fresh scan with the stored fingerprints tells which files
+    were added, modified or deleted since the last run, so only those need
+    to be ingested again.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        with database.transaction() as connection:
+            # Keyed by folder and path, since a file can be under a watched
+            # folder and under one of its subfolders watched at another time
+            primary_key = [name for _, name, _, _, _, pk in connection.execute("PRAGMA table_info(watched_files)")
+                           if pk]
+            if primary_key == ['path']:
+                # Keyed by path alone before; the rows stay valid
+                connection.execute("ALTER TABLE watched_files RENAME TO watched_files_old")
+                connection.execute("DROP INDEX IF EXISTS idx_watched_files_folder")
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS watched_files (
+                folder TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (folder, path)
+            )
+            ''')
+            if primary_key == ['path']:
+                connection.execute("INSERT INTO watched_files (folder, path, size, mtime_ns) "
+                                   "SELECT folder, path, size, mtime_ns FROM watched_files_old")
+                connection.execute("DROP TABLE watched_files_old")
+
+    @staticmethod
+    def scan(folder):
+        """Return {path: (size, mtime_ns)} for the CVs currently under folder"""
+        fingerprints = {}
+        for file_path in discover_cv_files(folder):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            fingerprints[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return fingerprints
+
+    def stored(self, folder):
+        rows = self.database.query("SELECT path, size, mtime_ns FROM watched_files WHERE folder = ?", (folder,))
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def changes(self, folder):
+        """Return (current, changed, deleted) for folder.
+
+        current maps every CV now in the folder to its fingerprint, changed
+        lists files added or modified since they were recorded, and deleted
+        lists recorded files that no longer exist.
+        """
+        current = self.scan(folder)
+        stored = self.stored(folder)
+        changed = [path for path, fingerprint in current.items() if stored.get(path) != fingerprint]
+        deleted = [path for path in stored if path not in current]
+        return current, changed, deleted
+
+    def record(self, folder, fingerprints):
+        """Store fingerprints ({path: (size, mtime_ns)}) for processed files"""
+        self.database.executemany(
+            "INSERT OR REPLACE INTO watched_files (folder, path, size, mtime_ns) VALUES (?, ?, ?, ?)",
+            [(folder, path, size, mtime_ns) for path, (size, mtime_ns) in fingerprints.items()])
+
+    def forget(self, folder, paths):
+        """Drop the fingerprints of paths recorded for folder"""
+        self.database.executemany("DELETE FROM watched_files WHERE folder = ? AND path = ?",
+                                  [(folder, path) for path in paths])
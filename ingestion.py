@@ -0,0 +1,272 @@
+import os
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from extractors import detect_format, extracts_in_process, open_pages
+from instrumentation import stats
+from keyword_matcher import MatchOffsets, get_matcher
+
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+def discover_cv_files(root):
+    """Lazily yield supported CV files under root, descending into subfolders"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield entry.path
+        # Visit subfolders in name order
+        stack.extend(reversed(subdirectories))
+
+
+def iter_cv_pages(file_path):
+    """Lazily yield a CV's text page by page (DOCX and text files are one page).
+
+    The format is detected from the file's content and the text comes from
+    the first extractor backend that can read it (see extractors).
+    """
+    return open_pages(file_path)[1]
+
+
+def read_cv_text(file_path):
+    """Extract the raw text of a PDF, DOCX or text CV"""
+    return "".join(iter_cv_pages(file_path))
+
+
+def find_keyword_matches(content, keywords, case_sensitive):
+    """Count whole-word matches of each keyword in content"""
+    return get_matcher(tuple(keywords), case_sensitive).count(content)
+
+
+def find_keyword_offsets(content, keywords, case_sensitive):
+    """Return the MatchOffsets of whole-word matches of each keyword in content"""
+    return get_matcher(tuple(keywords), case_sensitive).scan(content)
+
+
+def score_pages(pages, keywords, case_sensitive, threshold=None, weights=None, max_pages=None):
+    """Match keywords page by page, stopping as soon as the result is certain.
+
+    Reading stops once the weighted score reaches threshold (the CV is certain
+    to pass) or after max_pages pages (the cap decides it fails). Pages are
+    separated by newlines, so per-page matches add up to the whole-text ones.
+
+    Returns (offsets, text). text is None if reading stopped early, in which
+    case offsets only covers the pages read and the counts are lower bounds.
+    """
+    matcher = get_matcher(tuple(keywords), case_sensitive)
+    weights = weights or {}
+    read = []
+    parts = []  # (offset of the page in the text, page MatchOffsets)
+    base = 0
+    score = 0
+
+    def offsets_so_far():
+        return MatchOffsets.concatenate(parts) if parts else matcher.scan("")
+
+    try:
+        for page in pages:
+            if max_pages is not None and len(read) >= max_pages:
+                return offsets_so_far(), None
+            read.append(page)
+            page_offsets = matcher.scan(page)
+            parts.append((base, page_offsets))
+            base += len(page)
+            score += sum(count * weights.get(keyword, 1)
+                         for keyword, count in page_offsets.counts(keywords).items())
+            if threshold is not None and score >= threshold:
+                return offsets_so_far(), None
+    finally:
+        pages.close()
+    return offsets_so_far(), "".join(read)
+
+
+def extract_and_score(file_path, keywords, case_sensitive, threshold=None, weights=None, max_pages=None):
+    """Worker entry point: extract one CV and find its keyword matches.
+
+    Returns (file_path, offsets, text, timings), where offsets is a
+    MatchOffsets. text is None when extraction failed or stopped early (see
+    score_pages), so the caller knows not to cache it. timings is (format,
+    backend, extract_seconds, match_seconds, bytes, ok) for the caller to
+    record, since workers don't share its stats.
+    """
+    start = time.perf_counter()
+    file_format = detect_format(file_path)
+    backend = None
+    try:
+        size = os.path.getsize(file_path)
+        backend, pages = open_pages(file_path, file_format)
+        # Only PDFs have pages worth skipping
+        if file_format != 'pdf' or (threshold is None and max_pages is None):
+            text = "".join(pages)
+            extracted = time.perf_counter()
+            offsets = find_keyword_offsets(text, keywords, case_sensitive)
+            timings = (file_format, backend, extracted - start, time.perf_counter() - extracted, size, True)
+            return file_path, offsets, text, timings
+        # Pages are matched as they are read, so matching counts as extraction here
+        offsets, text = score_pages(pages, keywords, case_sensitive, threshold, weights, max_pages)
+        return file_path, offsets, text, (file_format, backend, time.perf_counter() - start, 0.0, size, True)
+    except Exception:
+        timings = (file_format, backend, time.perf_counter() - start, 0.0, 0, False)
+        return file_path, find_keyword_offsets("", keywords, case_sensitive), None, timings
+
+
+class IngestionEngine:
+    """Extracts and scores CVs across a pool of worker processes"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+
+    def set_workers(self, workers):
+        if workers != self.workers:
+            self.shutdown()
+            self.workers = workers
+
+    def get_executor(self):
+        # The pool is kept alive between runs so repeated filters don't pay
+        # the process start-up cost again. Spawned workers don't inherit the
+        # GUI process state.
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+
+    def run(self, file_paths, keywords, case_sensitive, cache=None, index=None, chunk_size=50,
+            threshold=None, weights=None, max_pages=None, duplicates=None):
+        """Yield lists of (file_path, matches, offsets) as results arrive.
+
+        matches is {keyword: count} and offsets the MatchOffsets of every
+        occurrence, so callers can show context without searching again.
+
+        file_paths can be any iterable, including a lazy generator such as
+        discover_cv_files(). It is consumed one file at a time and only a few
+        files per worker are in flight, so memory stays bounded however many
+        files there are. Extracted text goes to the cache and index, in one
+        transaction per chunk, and is then dropped. With a DuplicateIndex as
+        duplicates, every CV whose text is known is also signed for
+        near-duplicate detection.
+
+        Each file is answered from the first source that has it: the corpus
+        index, then the text cache, then extraction. Plain text files are read
+        in this thread, which is quicker than the round trip to a worker;
+        everything else goes to the worker pool.
+        threshold, weights and max_pages enable early exit during extraction
+        (see score_pages).
+        """
+        stop_rule = (threshold, weights, max_pages)
+        scorer = index.scorer(keywords, case_sensitive) if index is not None else None
+        max_in_flight = self.workers * 4
+        in_flight = set()
+        chunk = []
+        pending = []  # (file_path, text, source) to write before the chunk is yielded
+        try:
+            for file_path in file_paths:
+                offsets = None
+                if scorer is not None:
+                    with stats.timer("index.lookup"):
+                        offsets = scorer(file_path)
+                    if offsets is not None:
+                        stats.add("files_from_index")
+                        # Indexed before signatures were stored
+                        if duplicates is not None and not duplicates.is_current(file_path):
+                            pending.append((file_path, index.get_text(file_path) or "", 'index'))
+                if offsets is None:
+                    text = cache.get(file_path) if cache is not None else None
+                    if text is not None:
+                        stats.add("files_from_cache")
+                        pending.append((file_path, text, 'cache'))
+                        with stats.timer("match"):
+                            offsets = find_keyword_offsets(text, keywords, case_sensitive)
+                    elif self.workers <= 1 or extracts_in_process(file_path):
+                        offsets = self.store(extract_and_score(file_path, keywords, case_sensitive,
+                                                               *stop_rule), pending)
+                    else:
+                        in_flight.add(self.get_executor().submit(
+                            extract_and_score, file_path, keywords, case_sensitive, *stop_rule))
+
+                if offsets is not None:
+                    chunk.append((file_path, offsets.counts(keywords), offsets))
+
+                # Collect finished extractions once the pool is saturated
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    chunk.extend(self.collect(done, keywords, pending))
+
+                if len(chunk) >= chunk_size:
+                    self.flush(pending, cache, duplicates)
+                    yield chunk
+                    chunk = []
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                chunk.extend(self.collect(done, keywords, pending))
+                if len(chunk) >= chunk_size:
+                    self.flush(pending, cache, duplicates)
+                    yield chunk
+                    chunk = []
+        finally:
+            # In-flight futures are left when the caller closes the generator
+            # early (cancel); text extracted so far is still stored
+            for future in in_flight:
+                future.cancel()
+            self.flush(pending, cache, duplicates)
+
+        if chunk:
+            yield chunk
+
+    def collect(self, futures, keywords, pending):
+        results = []
+        for future in futures:
+            result = future.result()
+            offsets = self.store(result, pending)
+            results.append((result[0], offsets.counts(keywords), offsets))
+        return results
+
+    @staticmethod
+    def store(result, pending):
+        """Record an extract_and_score result, queue its text for storing and return its offsets"""
+        file_path, offsets, text, (file_format, backend, extract_seconds, match_seconds, size, ok) = result
+        stats.record(f"extract.{file_format}", extract_seconds)
+        if backend is not None:
+            # Per-backend throughput (see Instrumentation.snapshot)
+            stats.record(f"backend.{backend}", extract_seconds)
+            stats.add(f"backend_bytes.{backend}", size)
+        if match_seconds:
+            stats.record("match", match_seconds)
+        stats.add("files_extracted" if ok else "extraction_errors")
+        stats.add("bytes_parsed", size)
+        if text is not None:
+            pending.append((file_path, text, 'extracted'))
+        return offsets
+
+    @staticmethod
+    def flush(pending, cache, duplicates=None):
+        """Write queued texts to the cache and duplicate index, one transaction each.
+
+        The corpus index follows the cache, so it needs no writes of its own.
+        """
+        if cache is not None:
+            cache.put_many([(file_path, text) for file_path, text, source in pending if source == 'extracted'])
+        if duplicates is not None:
+            with stats.timer("dedup.sign"):
+                duplicates.add_many([(file_path, text) for file_path, text, _ in pending])
+        pending.clear()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
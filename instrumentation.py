@@ -0,0 +1,184 @@
+"""Per-stage timers, counters and an optional cProfile capture for the hot paths.
+
+Everything is recorded into the process-wide `stats` object. Extraction runs
+in worker processes, so extract_and_score returns its timings and the
+IngestionEngine records them here when the result comes back.
+
+Set CV_SHUFFLER_PROFILE=/path/to/file.prof to profile the GUI thread from
+start-up; the capture is written to that file when the app closes.
+"""
+import cProfile
+import inspect
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+PROFILE_ENV_VAR = 'CV_SHUFFLER_PROFILE'
+
+# Upper bounds in seconds of the latency histogram buckets (the last bucket is open)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def bucket_labels():
+    labels = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS]
+    labels.append(f">{LATENCY_BUCKETS[-1] * 1000:g}ms")
+    return labels
+
+
+class StageStats:
+    """Call count, total/min/max time and a latency histogram for one stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for bucket, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            bucket = len(LATENCY_BUCKETS)
+        self.histogram[bucket] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "min_seconds": self.min or 0.0,
+            "max_seconds": self.max,
+            "per_second": self.count / self.total if self.total > 0 else None,
+            "histogram": dict(zip(bucket_labels(), self.histogram)),
+        }
+
+
+class Instrumentation:
+    """Thread-safe registry of stage timings and counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.started_at = time.time()
+        self.profiler = None
+
+    def record(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds)
+
+    def add(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def instrument(self, stage):
+        """Decorator recording each call of the wrapped function under stage"""
+        def decorator(func):
+            # PyQt drops signal arguments a slot doesn't take (e.g. clicked's
+            # checked flag), but can't see through the wrapper, so do it here
+            parameters = inspect.signature(func).parameters.values()
+            max_args = None
+            if not any(p.kind == p.VAR_POSITIONAL for p in parameters):
+                max_args = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if max_args is not None:
+                    args = args[:max_args]
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Return all stages and counters, plus derived throughput, as a dict"""
+        with self.lock:
+            stages = {name: stats.as_dict() for name, stats in sorted(self.stages.items())}
+            counters = dict(sorted(self.counters.items()))
+
+        run_seconds = stages.get("filter.run", {}).get("total_seconds", 0.0)
+        extract_seconds = sum(stats["total_seconds"] for name, stats in stages.items()
+                              if name.startswith("extract."))
+        derived = {
+            # Wall-clock rate of filter runs
+            "files_per_second": counters.get("files_scored", 0) / run_seconds if run_seconds else None,
+            # Per-worker parse rate (extraction time is summed across workers)
+            "bytes_parsed_per_second": (counters.get("bytes_parsed", 0) / extract_seconds
+                                        if extract_seconds else None),
+            # Per-worker parse rate of each extractor backend
+            "backend_bytes_per_second": {
+                name[len("backend."):]: counters.get("backend_bytes." + name[len("backend."):], 0)
+                / stats["total_seconds"]
+                for name, stats in stages.items() if name.startswith("backend.") and stats["total_seconds"]
+            },
+        }
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "profiling": self.profiler is not None,
+            "derived": derived,
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def dump_json(self, file_path):
+        with open(file_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.started_at = time.time()
+
+    def start_profile(self):
+        """Start a cProfile capture (it only sees the thread that starts it)"""
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self, file_path=None, limit=30):
+        """Stop the capture, optionally saving it to file_path, and return a text summary"""
+        if self.profiler is None:
+            return ""
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        if file_path:
+            profiler.dump_stats(file_path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(limit)
+        return summary.getvalue()
+
+    def profile_from_env(self):
+        """Start profiling if CV_SHUFFLER_PROFILE is set; return the target file or None"""
+        file_path = os.environ.get(PROFILE_ENV_VAR)
+        if file_path:
+            self.start_profile()
+        return file_path or None
+
+
+stats = Instrumentation()
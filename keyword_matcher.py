@@ -0,0 +1,139 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+
+def _trie_pattern(node):
+    """Build a regex from a character trie, trying longer terms first"""
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    # A term ending here is optional, so the greedy group prefers the longer terms
+    return pattern + '?' if '' in node else pattern
+
+
+class KeywordMatcher:
+    """Counts whole-word occurrences of a fixed keyword set in one pass.
+
+    Gives the same counts as running r'\\bkeyword\\b' with re.findall for each
+    keyword separately, including keywords that overlap (e.g. "SQL" and
+    "SQL Server"), but scans the text only once.
+    """
+
+    def __init__(self, keywords, case_sensitive):
+        self.keywords = list(keywords)
+        self.case_sensitive = case_sensitive
+
+        # Keywords that differ only by case share a search term
+        self.keyword_terms = {}
+        self.terms = set()
+        for keyword in self.keywords:
+            term = keyword if case_sensitive else keyword.lower()
+            self.keyword_terms[keyword] = term
+            self.terms.add(term)
+
+        trie = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        # Zero-width lookahead so every starting position is reported, with
+        # the longest term that matches there
+        self.pattern = re.compile(r'\b(?=(' + _trie_pattern(trie) + r')\b)') if self.terms else None
+
+        # Shorter terms that can match at the same position as a longer one
+        self.prefix_terms = {}
+        for term in self.terms:
+            self.prefix_terms[term] = [
+                (other, re.compile(re.escape(other) + r'\b'))
+                for other in self.terms
+                if other != term and term.startswith(other)
+            ]
+
+    def count(self, content):
+        """Return {keyword: count} for content"""
+        return self.scan(content).counts(self.keywords)
+
+    def scan(self, content):
+        """Return the MatchOffsets of every keyword occurrence in content"""
+        if self.pattern is None:
+            return MatchOffsets.empty(len(self.keywords))
+        positions = {term: [] for term in self.terms}
+
+        if not self.case_sensitive:
+            content = content.lower()
+
+        # Like re.findall, occurrences of the same term never overlap
+        last_end = {}
+        for match in self.pattern.finditer(content):
+            pos = match.start()
+            term = match.group(1)
+            if pos >= last_end.get(term, 0):
+                positions[term].append(pos)
+                last_end[term] = pos + len(term)
+
+            for other, other_pattern in self.prefix_terms[term]:
+                if pos >= last_end.get(other, 0) and other_pattern.match(content, pos):
+                    positions[other].append(pos)
+                    last_end[other] = pos + len(other)
+
+        return MatchOffsets.from_lists([positions[self.keyword_terms[keyword]] for keyword in self.keywords])
+
+
+class MatchOffsets:
+    """Start offsets of every keyword occurrence in one text, stored compactly.
+
+    All offsets are in one int32 array grouped by keyword, in the order of
+    the keyword list that was scanned for; offsets[bounds[i]:bounds[i + 1]]
+    are the (ascending) offsets of keyword i. The keyword list itself isn't
+    stored, so callers pass it in.
+    """
+
+    __slots__ = ('offsets', 'bounds')
+
+    def __init__(self, offsets, bounds):
+        self.offsets = offsets
+        self.bounds = bounds
+
+    @classmethod
+    def from_lists(cls, positions):
+        """Build from one list of offsets per keyword"""
+        bounds = np.zeros(len(positions) + 1, dtype=np.int32)
+        bounds[1:] = np.cumsum([len(p) for p in positions])
+        offsets = np.fromiter((pos for p in positions for pos in p), dtype=np.int32, count=int(bounds[-1]))
+        return cls(offsets, bounds)
+
+    @classmethod
+    def empty(cls, keyword_count):
+        return cls(np.zeros(0, dtype=np.int32), np.zeros(keyword_count + 1, dtype=np.int32))
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Join (base, MatchOffsets) pairs of consecutive text pieces, shifting each by its base"""
+        keyword_count = len(parts[0][1].bounds) - 1
+        return cls.from_lists([
+            np.concatenate([part.positions(i) + base for base, part in parts]).tolist()
+            for i in range(keyword_count)
+        ])
+
+    def positions(self, i):
+        """Offsets of keyword i"""
+        return self.offsets[self.bounds[i]:self.bounds[i + 1]]
+
+    def counts(self, keywords):
+        """Return {keyword: count} for the keyword list that was scanned for"""
+        sizes = np.diff(self.bounds)
+        return {keyword: int(sizes[i]) for i, keyword in enumerate(keywords)}
+
+
+@lru_cache(maxsize=32)
+def get_matcher(keywords, case_sensitive):
+    """Return a compiled matcher for a tuple of keywords, reusing recent ones"""
+    return KeywordMatcher(keywords, case_sensitive)
@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import cv_engine
+from extractors import detect_format
+from instrumentation import stats
+
+
+def render_preview_html(file_path):
+    """Return the preview HTML of a DOCX or text CV (None for PDFs, which are shown directly)"""
+    file_format = detect_format(file_path)
+    if file_format == 'pdf':
+        return None
+    if file_format == 'docx':
+        from docx import Document
+        try:
+            doc = Document(file_path)
+            # Only add non-empty paragraphs
+            paragraphs = [f"<p>{para.text}</p>" for para in doc.paragraphs if para.text.strip()]
+            return "<div style='font-family: Arial, sans-serif; padding: 20px;'>" + "".join(paragraphs) + "</div>"
+        except Exception as e:
+            return f"<h3>Error displaying DOCX file: {str(e)}</h3>"
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return f"<pre style='font-family: monospace; padding: 20px;'>{content}</pre>"
+    except Exception as e:
+        return f"<h3>Error displaying text file: {str(e)}</h3>"
+
+
+class PreviewCache:
+    """LRU cache of rendered preview HTML and extracted text, capped by memory.
+
+    Entries remember the file's size and mtime and are dropped when the file
+    changes. Filled from the GUI thread and the prefetch worker, so every
+    access takes the lock.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # file path -> (fingerprint, html, text, size)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def lookup(self, file_path):
+        """Return the fresh (html, text) of file_path or None, without counting a hit or miss"""
+        fingerprint = self.fingerprint(file_path)
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if entry is None:
+                return None
+            if entry[0] != fingerprint:
+                self.discard(file_path)
+                return None
+            self.entries.move_to_end(file_path)
+            return entry[1], entry[2]
+
+    def get(self, file_path):
+        preview = self.lookup(file_path)
+        with self.lock:
+            if preview is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return preview
+
+    def put(self, file_path, html, text, fingerprint):
+        size = sys.getsizeof(html) + sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            self.discard(file_path)
+            self.entries[file_path] = (fingerprint, html, text, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self.discard(next(iter(self.entries)))
+
+    def discard(self, file_path):
+        # Callers hold the lock
+        entry = self.entries.pop(file_path, None)
+        if entry is not None:
+            self.total_bytes -= entry[3]
+
+    def render(self, file_path, text_cache=None):
+        """Render file_path's preview and text into the cache and return (html, text)"""
+        # Fingerprint first, so a file modified while rendering is redone next time
+        fingerprint = self.fingerprint(file_path)
+        with stats.timer("preview.render"):
+            preview = render_preview_html(file_path), cv_engine.extract_text(file_path, text_cache)
+        self.put(file_path, *preview, fingerprint)
+        return preview
+
+    def load(self, file_path, text_cache=None):
+        """Return (html, text) for file_path, rendering and caching it on a miss"""
+        preview = self.get(file_path)
+        if preview is None:
+            preview = self.render(file_path, text_cache)
+        return preview
+
+    def prefetch(self, file_path, text_cache=None):
+        """Render file_path into the cache unless it is already there"""
+        if self.lookup(file_path) is None:
+            self.render(file_path, text_cache)
+
+    def status_text(self):
+        return (f"Preview cache: {len(self.entries)} CVs, {self.total_bytes / (1024 * 1024):.1f} MB, "
+                f"{self.hits} hits")
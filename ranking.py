@@ -0,0 +1,175 @@
+"""BM25 relevance ranking of the loaded CVs.
+
+The corpus is tokenised once into a sparse term x CV matrix of BM25 weights
+(term-major CSR in NumPy arrays). Ranking a keyword set or a pasted job
+description is then one sparse matrix-vector product, so any number of
+queries can be tried without reading the CVs again. Unlike raw keyword
+counts, BM25 saturates repeated terms and normalises for CV length, and
+common synonyms are folded into one term on both sides.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+
+from export_engine import known_text
+from ingestion import read_cv_text
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Alternative spellings mapped to the term they are indexed as
+SYNONYMS = {
+    'k8s': 'kubernetes',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'golang': 'go',
+    'py': 'python',
+    'postgres': 'postgresql',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'ci': 'continuous integration',
+    'cd': 'continuous delivery',
+    'aws': 'amazon web services',
+    'gcp': 'google cloud platform',
+    'ux': 'user experience',
+    'ui': 'user interface',
+    'seo': 'search engine optimisation',
+    'optimization': 'optimisation',
+    'crm': 'customer relationship management',
+}
+
+
+def synonym_table(synonyms):
+    """Return {term: [tokens]} with every replacement tokenised"""
+    return {term.lower(): TOKEN_PATTERN.findall(replacement.lower()) for term, replacement in synonyms.items()}
+
+
+DEFAULT_SYNONYMS = synonym_table(SYNONYMS)
+
+
+def tokenize(text, synonyms=DEFAULT_SYNONYMS):
+    """Return text's lowercase word tokens with synonyms replaced"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        replacement = synonyms.get(token)
+        if replacement is None:
+            tokens.append(token)
+        else:
+            tokens.extend(replacement)
+    return tokens
+
+
+def term_counts(text, synonyms=DEFAULT_SYNONYMS):
+    """Return a Counter of text's terms, the same as Counter(tokenize(text)) but quicker"""
+    counts = Counter(TOKEN_PATTERN.findall(text.lower()))
+    # Replace synonyms once per distinct term rather than per token
+    for term in counts.keys() & synonyms.keys():
+        count = counts.pop(term)
+        for replacement in synonyms[term]:
+            counts[replacement] += count
+    return counts
+
+
+def corpus_texts(file_paths, cache=None, index=None):
+    """Yield (file_path, text) using already extracted text where there is any"""
+    for file_path in file_paths:
+        text = known_text(file_path, cache, index)
+        if text is None:
+            try:
+                text = read_cv_text(file_path)
+            except Exception:
+                text = ""
+        yield file_path, text
+
+
+class BM25Index:
+    """BM25 weights of every term in a set of CVs"""
+
+    def __init__(self, paths, vocabulary, term_ptr, doc_ids, weights, synonyms=DEFAULT_SYNONYMS):
+        self.paths = paths
+        self.path_set = frozenset(paths)
+        self.vocabulary = vocabulary  # term -> column
+        # Documents containing term t are doc_ids[term_ptr[t]:term_ptr[t + 1]],
+        # with their BM25 weights at the same positions of weights
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.synonyms = synonyms
+
+    @classmethod
+    def build(cls, documents, k1=1.2, b=0.75, synonyms=DEFAULT_SYNONYMS):
+        """Build the index from an iterable of (file_path, text)"""
+        paths = []
+        vocabulary = {}
+        doc_ids = []
+        term_ids = []
+        frequencies = []
+        lengths = []
+        for doc_id, (file_path, text) in enumerate(documents):
+            counts = term_counts(text, synonyms)
+            paths.append(file_path)
+            lengths.append(sum(counts.values()))
+            doc_ids.extend([doc_id] * len(counts))
+            term_ids.extend(vocabulary.setdefault(term, len(vocabulary)) for term in counts)
+            frequencies.extend(counts.values())
+
+        doc_ids = np.array(doc_ids, dtype=np.int32)
+        term_ids = np.array(term_ids, dtype=np.int32)
+        frequencies = np.array(frequencies, dtype=np.float32)
+        lengths = np.array(lengths, dtype=np.float32)
+
+        # Group the entries by term
+        order = np.argsort(term_ids, kind='stable')
+        doc_ids = doc_ids[order]
+        frequencies = frequencies[order]
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        term_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=term_ptr[1:])
+
+        num_docs = len(paths)
+        average_length = lengths.mean() if num_docs and lengths.mean() > 0 else 1.0
+        idf = np.log1p((num_docs - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        term_idf = np.repeat(idf, document_frequency)
+        length_norm = k1 * (1 - b + b * lengths[doc_ids] / average_length)
+        weights = term_idf * frequencies * (k1 + 1) / (frequencies + length_norm)
+        return cls(paths, vocabulary, term_ptr, doc_ids, weights.astype(np.float32), synonyms)
+
+    def query_terms(self, query, weights=None):
+        """Return {column: weight} for a job description (str) or a keyword list.
+
+        Each keyword's terms get its weight from weights (default 1); terms
+        of a job description count once per occurrence.
+        """
+        weights = weights or {}
+        if isinstance(query, str):
+            pairs = [(term, 1) for term in tokenize(query, self.synonyms)]
+        else:
+            pairs = [(term, weights.get(keyword, 1)) for keyword in query
+                     for term in tokenize(keyword, self.synonyms)]
+        terms = {}
+        for term, weight in pairs:
+            column = self.vocabulary.get(term)
+            if column is not None:
+                terms[column] = terms.get(column, 0) + weight
+        return terms
+
+    def score(self, query, weights=None):
+        """Return the BM25 score of every CV (in paths order) for query"""
+        terms = self.query_terms(query, weights)
+        if not terms:
+            return np.zeros(len(self.paths), dtype=np.float32)
+        columns = np.fromiter(terms, dtype=np.int64, count=len(terms))
+        query_weights = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+        starts, ends = self.term_ptr[columns], self.term_ptr[columns + 1]
+        entries = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+        contributions = self.weights[entries] * np.repeat(query_weights, ends - starts)
+        return np.bincount(self.doc_ids[entries], weights=contributions, minlength=len(self.paths))
+
+    def relevance(self, query, weights=None):
+        """Return {file_path: relevance}, as a percentage of the best CV's score"""
+        scores = self.score(query, weights)
+        best = scores.max() if len(scores) else 0.0
+        if best > 0:
+            scores = scores * (100.0 / best)
+        return dict(zip(self.paths, scores.tolist()))
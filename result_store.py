@@ -0,0 +1,191 @@
+"""Keyword match counts and scores of every scored CV, stored by column.
+
+Paths and keywords are interned once into row and column tables and the
+counts of all CVs live in one int32 matrix, instead of a {keyword: count}
+dict per CV repeating every keyword string. Each CV's score is cached next
+to its counts, so thresholds and auto-select are mask operations over one
+array. Looking a path up still gives a {keyword: count} dict, so the store
+can be read wherever those dicts were.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class ResultStore(Mapping):
+    """{file_path: {keyword: count}} of the scored CVs, with their scores"""
+
+    def __init__(self, keywords=(), weights=None):
+        self.paths = []  # row -> file path, in the order CVs were added
+        self.rows = {}  # file path -> row
+        self.keywords = []  # column -> keyword
+        self.columns = {}  # keyword -> column
+        # Rows beyond len(paths) are spare capacity
+        self._counts = np.zeros((0, 0), dtype=np.int32)
+        self._scores = np.zeros(0)
+        self.scored_keywords = []
+        self.weights = {}
+        self.weight_vector = np.zeros(0)  # per column, 0 for keywords that aren't scored
+        self.set_weights(keywords, weights)
+
+    @classmethod
+    def from_arrays(cls, paths, keywords, counts, scores, scored_keywords, weights=None):
+        """Build a store around existing arrays (e.g. memory-mapped ones) without copying them"""
+        store = cls()
+        store.paths = list(paths)
+        store.rows = {file_path: row for row, file_path in enumerate(store.paths)}
+        store.keywords = list(keywords)
+        store.columns = {keyword: column for column, keyword in enumerate(store.keywords)}
+        store._counts = counts
+        store._scores = scores
+        store.scored_keywords = list(scored_keywords)
+        store.weights = weights or {}
+        store.weight_vector = np.zeros(len(store.keywords))
+        for keyword in store.scored_keywords:
+            store.weight_vector[store.columns[keyword]] = store.weights.get(keyword, 1)
+        return store
+
+    @property
+    def counts(self):
+        """CV x keyword count matrix, in paths and keywords order"""
+        return self._counts[:len(self.paths)]
+
+    @property
+    def scores(self):
+        """Score of every CV, in paths order"""
+        return self._scores[:len(self.paths)]
+
+    def __getitem__(self, file_path):
+        counts = self._counts[self.rows[file_path]]
+        return {keyword: int(counts[column]) for column, keyword in enumerate(self.keywords)}
+
+    def __contains__(self, file_path):
+        return file_path in self.rows
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add_keywords(self, keywords):
+        new = [keyword for keyword in keywords if keyword not in self.columns]
+        if not new:
+            return
+        for keyword in new:
+            self.columns[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+        self._counts = np.pad(self._counts, ((0, 0), (0, len(new))))
+        self.weight_vector = np.concatenate([self.weight_vector, np.zeros(len(new))])
+
+    def covers(self, keywords):
+        """Return True if every keyword has a column, so scoring them needs no recount"""
+        return all(keyword in self.columns for keyword in keywords)
+
+    def set_weights(self, keywords, weights=None):
+        """Score every CV as the dot product of its counts of keywords and their weights.
+
+        Keywords without an entry in weights count with weight 1; other
+        columns don't count, so the store can be re-ranked for any subset of
+        its keywords without recounting.
+        """
+        self.scored_keywords = list(keywords)
+        self.weights = weights or {}
+        self.add_keywords(self.scored_keywords)
+        self.weight_vector = np.zeros(len(self.keywords))
+        for keyword in self.scored_keywords:
+            self.weight_vector[self.columns[keyword]] = self.weights.get(keyword, 1)
+        self._scores[:len(self.paths)] = self.counts @ self.weight_vector
+
+    def set_scores(self, scores):
+        """Replace the scores with {file_path: score} (e.g. relevance); CVs not in scores get 0"""
+        self._scores[:len(self.paths)] = 0
+        for file_path, score in scores.items():
+            row = self.rows.get(file_path)
+            if row is not None:
+                self._scores[row] = score
+
+    def add(self, file_path, matches):
+        """Store (or replace) a CV's {keyword: count} and score it"""
+        self.add_keywords(matches)
+        row = self.rows.get(file_path)
+        if row is None:
+            row = len(self.paths)
+            if row == len(self._counts):
+                # Double the capacity so appending stays amortised O(1)
+                capacity = max(2 * row, 64)
+                self._counts = np.pad(self._counts, ((0, capacity - row), (0, 0)))
+                self._scores = np.pad(self._scores, (0, capacity - row))
+            self.rows[file_path] = row
+            self.paths.append(file_path)
+        counts = self._counts[row]
+        counts[:] = 0
+        for keyword, count in matches.items():
+            counts[self.columns[keyword]] = count
+        self._scores[row] = counts @ self.weight_vector
+
+    def add_many(self, items):
+        for file_path, matches in items:
+            self.add(file_path, matches)
+
+    def remove_many(self, file_paths):
+        """Drop CVs, keeping the order of the rest"""
+        removed = [self.rows[file_path] for file_path in file_paths if file_path in self.rows]
+        if not removed:
+            return
+        keep = np.ones(len(self.paths), dtype=bool)
+        keep[removed] = False
+        self._counts = self.counts[keep]
+        self._scores = self.scores[keep]
+        self.paths = [file_path for file_path, kept in zip(self.paths, keep) if kept]
+        self.rows = {file_path: row for row, file_path in enumerate(self.paths)}
+
+    def score(self, file_path):
+        return float(self._scores[self.rows[file_path]])
+
+    def score_dict(self):
+        return dict(zip(self.paths, self.scores.tolist()))
+
+    def at_least(self, threshold):
+        """Return the paths of the CVs scoring at least threshold, in paths order"""
+        return [self.paths[row] for row in np.flatnonzero(self.scores >= threshold)]
+
+    def in_score_range(self, low=None, high=None):
+        """Return the paths of the CVs scoring from low to high (inclusive, None for no limit)"""
+        mask = np.ones(len(self.paths), dtype=bool)
+        if low is not None:
+            mask &= self.scores >= low
+        if high is not None:
+            mask &= self.scores <= high
+        return [self.paths[row] for row in np.flatnonzero(mask)]
+
+    def distribution(self, exclude=()):
+        """Return the ScoreDistribution of the scored CVs, leaving out the paths in exclude"""
+        if exclude:
+            keep = np.array([file_path not in exclude for file_path in self.paths], dtype=bool)
+            return ScoreDistribution([file_path for file_path, kept in zip(self.paths, keep) if kept],
+                                     self.scores[keep])
+        return ScoreDistribution(self.paths, self.scores)
+
+
+class ScoreDistribution:
+    """Scores sorted once, so the CVs at or above any threshold are found in log time.
+
+    paths and scores are in descending score order (ties in store order), so
+    the CVs at or above a threshold are always a prefix of paths.
+    """
+
+    def __init__(self, paths, scores, bins=30):
+        order = np.argsort(-scores, kind='stable')
+        self.paths = [paths[row] for row in order]
+        self.scores = scores[order]
+        self.ascending = self.scores[::-1]
+        # (counts, bin edges) from 0 to the best score
+        top = float(self.scores[0]) if len(self.scores) else 0.0
+        self.histogram = np.histogram(self.scores, bins=bins, range=(0.0, max(top, 1.0)))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def count_at_least(self, threshold):
+        return len(self.scores) - int(np.searchsorted(self.ascending, threshold, side='left'))
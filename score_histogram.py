@@ -0,0 +1,80 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QBrush, QColor, QPainter
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+
+class ScoreHistogram(QWidget):
+    """Bar chart of the score distribution, with the bars at or above the threshold highlighted.
+
+    The bin counts come precomputed with the distribution, so moving the
+    threshold only repaints. Bins of scores that are only lower bounds (early
+    exit stopped counting) are hatched.
+    """
+
+    ABOVE_COLOUR = QColor(90, 170, 90)
+    BELOW_COLOUR = QColor(180, 180, 180)
+    THRESHOLD_COLOUR = QColor(200, 60, 60)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.counts = np.zeros(0)
+        self.edges = np.zeros(1)
+        self.threshold = None
+        self.lower_bound = None  # scores from here up are lower bounds
+        self.setMinimumHeight(50)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def set_histogram(self, counts, edges):
+        self.counts = counts
+        self.edges = edges
+        self.update_tooltip()
+        self.update()
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+        self.update_tooltip()
+        self.update()
+
+    def set_lower_bound(self, lower_bound):
+        self.lower_bound = lower_bound
+        self.update_tooltip()
+        self.update()
+
+    def update_tooltip(self):
+        if not len(self.counts):
+            self.setToolTip("")
+            return
+        tooltip = f"Scores of {int(self.counts.sum())} CVs from {self.edges[0]:.0f} to {self.edges[-1]:.0f}"
+        if self.lower_bound is not None and self.edges[-1] >= self.lower_bound:
+            tooltip += f"; scores from {self.lower_bound} up are lower bounds (early exit)"
+        self.setToolTip(tooltip)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        painter.fillRect(self.rect(), self.palette().base())
+        if not len(self.counts) or not self.counts.max():
+            painter.end()
+            return
+
+        span = self.edges[-1] - self.edges[0]
+        bar_width = width / len(self.counts)
+        tallest = self.counts.max()
+        painter.setPen(Qt.NoPen)
+        for i, count in enumerate(self.counts):
+            bar_height = (height - 2) * count / tallest
+            # A bin is highlighted once its lower edge reaches the threshold
+            above = self.threshold is not None and self.edges[i] >= self.threshold
+            colour = self.ABOVE_COLOUR if above else self.BELOW_COLOUR
+            if self.lower_bound is not None and self.edges[i] >= self.lower_bound:
+                painter.setBrush(QBrush(colour, Qt.BDiagPattern))
+            else:
+                painter.setBrush(colour)
+            painter.drawRect(QRectF(i * bar_width, height - bar_height, max(bar_width - 1, 1), bar_height))
+
+        if self.threshold is not None and span > 0:
+            x = width * (self.threshold - self.edges[0]) / span
+            painter.setPen(self.THRESHOLD_COLOUR)
+            painter.drawLine(int(x), 0, int(x), height)
+        painter.end()
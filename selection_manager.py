@@ -0,0 +1,194 @@
+import os
+import re
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class LiveSlots:
+    """Fenwick tree over slots that are live (1) or deleted (0).
+
+    Gives the row of a slot (the live slots before it) and the slot of a
+    row in log time, so deleting a slot doesn't shift the rows after it.
+    """
+
+    def __init__(self, size=0):
+        # tree[i] sums the slots (i - lowbit(i), i], 1-based
+        self.tree = [0] + [1] * size
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+
+    def append(self):
+        """Add a live slot at the end"""
+        i = len(self.tree)
+        self.tree.append(1 + self.row(i - 1) - self.row(i - (i & -i)))
+
+    def delete(self, slot):
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] -= 1
+            i += i & -i
+
+    def truncate(self, size):
+        """Drop every slot from size on"""
+        del self.tree[size + 1:]
+
+    def row(self, slot):
+        """Return the number of live slots before slot"""
+        count = 0
+        while slot > 0:
+            count += self.tree[slot]
+            slot -= slot & -slot
+        return count
+
+    def slot(self, row):
+        """Return the slot of the row-th live slot"""
+        slot = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if slot + step < len(self.tree) and self.tree[slot + step] <= row:
+                slot += step
+                row -= self.tree[slot]
+            step >>= 1
+        return slot
+
+
+class SelectionManager(QAbstractListModel):
+    """The selected candidates: an ordered set of file paths that a list view shows.
+
+    Membership is a dict lookup, so checking, adding and removing a
+    candidate no longer scans the list. A deselected candidate's slot is
+    left empty and LiveSlots maps slots to view rows, so a single removal
+    takes log time; empty slots are compacted away once they outnumber the
+    candidates. Bulk changes are applied to the set first and reach the
+    view as a single insert, remove or reset.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.slots = []  # file paths in the order they were selected, None where deselected
+        self.slot_of = {}  # file path -> slot
+        self.live = LiveSlots()
+
+    def __contains__(self, file_path):
+        return file_path in self.slot_of
+
+    def __iter__(self):
+        return (file_path for file_path in self.slots if file_path is not None)
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.slot_of)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_path = self.slots[self.live.slot(index.row())]
+        if role == Qt.DisplayRole:
+            return os.path.basename(file_path)
+        if role == Qt.ToolTipRole or role == Qt.UserRole:
+            return file_path
+        return None
+
+    def add(self, file_path):
+        """Select file_path; returns False if it already was"""
+        return self.add_many([file_path]) == 1
+
+    def add_many(self, file_paths):
+        """Select every file path not selected yet, in order; returns how many were added"""
+        new = [file_path for file_path in dict.fromkeys(file_paths) if file_path not in self.slot_of]
+        if new:
+            count = len(self.slot_of)
+            self.beginInsertRows(QModelIndex(), count, count + len(new) - 1)
+            for file_path in new:
+                self.slot_of[file_path] = len(self.slots)
+                self.slots.append(file_path)
+                self.live.append()
+            self.endInsertRows()
+        return len(new)
+
+    def remove(self, file_path):
+        """Deselect file_path; returns False if it wasn't selected"""
+        slot = self.slot_of.get(file_path)
+        if slot is None:
+            return False
+        row = self.live.row(slot)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.slot_of[file_path]
+        self.slots[slot] = None
+        self.live.delete(slot)
+        self.endRemoveRows()
+        if len(self.slots) > 2 * len(self.slot_of) + 64:
+            # Rows don't change, so the view needn't hear about it
+            self.compact(list(self))
+        return True
+
+    def remove_many(self, file_paths):
+        """Deselect every selected file path in file_paths; returns how many were removed"""
+        removed = {file_path for file_path in file_paths if file_path in self.slot_of}
+        if len(removed) == 1:
+            self.remove(removed.pop())
+            return 1
+        if removed:
+            self.beginResetModel()
+            self.compact([file_path for file_path in self if file_path not in removed])
+            self.endResetModel()
+        return len(removed)
+
+    def truncate(self, count):
+        """Keep only the first count candidates"""
+        if count >= len(self.slot_of):
+            return
+        slot = self.live.slot(count)
+        self.beginRemoveRows(QModelIndex(), count, len(self.slot_of) - 1)
+        for file_path in self.slots[slot:]:
+            if file_path is not None:
+                del self.slot_of[file_path]
+        del self.slots[slot:]
+        self.live.truncate(slot)
+        self.endRemoveRows()
+
+    def set_paths(self, file_paths):
+        """Replace the selection"""
+        self.beginResetModel()
+        self.compact(dict.fromkeys(file_paths))
+        self.endResetModel()
+
+    def compact(self, file_paths):
+        """Store file_paths (distinct, in order) in consecutive slots"""
+        self.slots = list(file_paths)
+        self.slot_of = {file_path: slot for slot, file_path in enumerate(self.slots)}
+        self.live = LiveSlots(len(self.slots))
+
+    def clear(self):
+        self.set_paths([])
+
+
+def parse_score_range(text):
+    """Parse "low-high", "low-" or "-high" into (low, high), None for an open end"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)?\s*-\s*(\d+(?:\.\d*)?)?\s*', text)
+    if match is None or match.groups() == (None, None):
+        try:
+            # A single number selects that exact score
+            score = float(text)
+        except ValueError:
+            raise ValueError(f"Not a score range: {text!r} (use e.g. 10-20, 10- or -5)")
+        return score, score
+    low, high = (float(value) if value is not None else None for value in match.groups())
+    return low, high
+
+
+def paths_in_folder(file_paths, folder):
+    """Return the file paths inside folder or its subfolders"""
+    prefix = os.path.join(os.path.normcase(os.path.abspath(folder)), '')
+    return [file_path for file_path in file_paths
+            if os.path.normcase(os.path.abspath(file_path)).startswith(prefix)]
+
+
+def paths_matching_name(file_paths, pattern):
+    """Return the file paths whose file name matches the regular expression pattern (ignoring case)"""
+    regex = re.compile(pattern, re.IGNORECASE)
+    return [file_path for file_path in file_paths if regex.search(os.path.basename(file_path))]
@@ -0,0 +1,180 @@
+"""Saved review sessions: the CV list, scores, keyword offsets and selection.
+
+Session settings and the CV list are rows in cv_shuffler.db; the bulky
+arrays (the CV x keyword count matrix, scores and every keyword offset) are
+.npy files in a directory of data/sessions/ next to it. Opening a session maps those
+files into memory instead of reading them, so it takes about as long for 10k
+CVs as for 100, and pages are only read when a CV's counts or offsets are
+used. Nothing is re-extracted; previews come from the text cache as usual.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from keyword_matcher import MatchOffsets
+from result_store import ResultStore
+
+
+class ReviewSession:
+    """Everything needed to pick a review up where it was left"""
+
+    def __init__(self, cv_files, results, keyword_offsets, offset_keywords, selected, settings):
+        self.cv_files = cv_files
+        self.results = results  # ResultStore
+        self.keyword_offsets = keyword_offsets  # file path -> MatchOffsets of offset_keywords
+        self.offset_keywords = tuple(offset_keywords)  # keywords the offsets were scanned for
+        self.selected = selected
+        self.settings = settings  # keyword text, weights, threshold, ranking etc.
+
+
+class SessionStore:
+    """Review sessions saved in cv_shuffler.db and .npy files beside it"""
+
+    def __init__(self, database, sessions_dir):
+        self.database = database
+        self.sessions_dir = sessions_dir
+        with database.transaction() as connection:
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS review_sessions (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                saved_at REAL NOT NULL,
+                settings TEXT NOT NULL,
+                arrays_dir TEXT NOT NULL
+            )
+            ''')
+            # listed CVs are in the CV list in position order; result_row is
+            # the CV's row in the arrays (NULL if unscored) and selected its
+            # place in the selection (NULL if not selected)
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS review_session_cvs (
+                session_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                listed INTEGER NOT NULL,
+                result_row INTEGER,
+                selected INTEGER,
+                FOREIGN KEY (session_id) REFERENCES review_sessions (id)
+            )
+            ''')
+            connection.execute("CREATE INDEX IF NOT EXISTS review_session_cvs_session "
+                               "ON review_session_cvs (session_id, position)")
+
+    def names(self):
+        """Return the saved session names, most recent first"""
+        return [name for (name,) in self.database.query("SELECT name FROM review_sessions ORDER BY saved_at DESC")]
+
+    def save(self, name, session):
+        """Save session under name, replacing any session of that name"""
+        results = session.results
+        rows = results.rows
+        selected = {file_path: i for i, file_path in enumerate(session.selected)}
+        listed = set(session.cv_files)
+        cvs = [(file_path, True) for file_path in session.cv_files]
+        # Selected CVs from an earlier list are kept after the listed ones
+        cvs.extend((file_path, False) for file_path in session.selected if file_path not in listed)
+        listed.update(session.selected)
+        cvs.extend((file_path, False) for file_path in results.paths if file_path not in listed)
+
+        # Every save writes a new directory, since the previous one may still
+        # be memory-mapped by the session being saved over
+        arrays_dir = str(time.time_ns())
+        self.write_arrays(os.path.join(self.sessions_dir, arrays_dir), results, session.keyword_offsets,
+                          session.offset_keywords)
+        settings = json.dumps(dict(session.settings, keywords=results.keywords,
+                                   scored_keywords=results.scored_keywords,
+                                   offset_keywords=session.offset_keywords))
+        try:
+            with self.database.transaction() as connection:
+                row = connection.execute("SELECT id, arrays_dir FROM review_sessions WHERE name = ?",
+                                         (name,)).fetchone()
+                if row is not None:
+                    connection.execute("DELETE FROM review_session_cvs WHERE session_id = ?", (row[0],))
+                    connection.execute("DELETE FROM review_sessions WHERE id = ?", (row[0],))
+                session_id = connection.execute(
+                    "INSERT INTO review_sessions (name, saved_at, settings, arrays_dir) VALUES (?, ?, ?, ?)",
+                    (name, time.time(), settings, arrays_dir)).lastrowid
+                connection.executemany(
+                    "INSERT INTO review_session_cvs (session_id, position, path, listed, result_row, selected) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, position, file_path, is_listed, rows.get(file_path), selected.get(file_path))
+                     for position, (file_path, is_listed) in enumerate(cvs)])
+        except Exception:
+            shutil.rmtree(os.path.join(self.sessions_dir, arrays_dir), ignore_errors=True)
+            raise
+        if row is not None:
+            # Fails harmlessly on Windows while the old arrays are still mapped
+            shutil.rmtree(os.path.join(self.sessions_dir, row[1]), ignore_errors=True)
+
+    def write_arrays(self, session_dir, results, keyword_offsets, offset_keywords):
+        """Write the count matrix, scores and offsets of offset_keywords as .npy files, in result row order"""
+        keyword_count = len(offset_keywords)
+        parts = []
+        starts = np.zeros(len(results) + 1, dtype=np.int64)
+        # Offset bounds of each CV, relative to its start; -1 where it has none
+        bounds = np.full((len(results), keyword_count + 1), -1, dtype=np.int32)
+        for row, file_path in enumerate(results.paths):
+            offsets = keyword_offsets.get(file_path)
+            if offsets is not None and len(offsets.bounds) == keyword_count + 1:
+                parts.append(offsets.offsets)
+                bounds[row] = offsets.bounds
+                starts[row + 1] = len(offsets.offsets)
+        np.cumsum(starts, out=starts)
+
+        os.makedirs(session_dir)
+        np.save(os.path.join(session_dir, 'counts.npy'), results.counts)
+        np.save(os.path.join(session_dir, 'scores.npy'), results.scores)
+        np.save(os.path.join(session_dir, 'offsets.npy'),
+                np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32))
+        np.save(os.path.join(session_dir, 'offset_starts.npy'), starts)
+        np.save(os.path.join(session_dir, 'offset_bounds.npy'), bounds)
+
+    def load(self, name):
+        """Return the ReviewSession saved as name, or None if there is none"""
+        row = self.database.query_one("SELECT id, settings, arrays_dir FROM review_sessions WHERE name = ?",
+                                      (name,))
+        if row is None:
+            return None
+        session_id, settings, arrays_dir = row[0], json.loads(row[1]), row[2]
+        cvs = self.database.query("SELECT path, listed, result_row, selected FROM review_session_cvs "
+                                  "WHERE session_id = ? ORDER BY position", (session_id,))
+
+        def mapped(file_name):
+            # Copy-on-write, so the session's CVs can be rescored without touching the file
+            return np.load(os.path.join(self.sessions_dir, arrays_dir, file_name), mmap_mode='c')
+
+        counts = mapped('counts.npy')
+        paths = [None] * len(counts)
+        for path, _, result_row, _ in cvs:
+            if result_row is not None:
+                paths[result_row] = path
+        results = ResultStore.from_arrays(paths, settings['keywords'], counts, mapped('scores.npy'),
+                                          settings['scored_keywords'], settings.get('weights'))
+
+        # MatchOffsets are views of the mapped offsets, read only when a CV's
+        # keyword table is shown. They are only usable with the keywords they
+        # were scanned for; sessions saved without those get none.
+        offset_keywords = tuple(settings.get('offset_keywords', ()))
+        offsets, starts, bounds = mapped('offsets.npy'), mapped('offset_starts.npy'), mapped('offset_bounds.npy')
+        keyword_offsets = {}
+        if offset_keywords and bounds.shape[1:] == (len(offset_keywords) + 1,):
+            has_offsets = bounds[:, 0] >= 0
+            keyword_offsets = {path: MatchOffsets(offsets[starts[row]:starts[row + 1]], bounds[row])
+                               for row, path in enumerate(paths) if has_offsets[row]}
+
+        cv_files = [path for path, listed, _, _ in cvs if listed]
+        selected = [path for _, path in sorted((position, path) for path, _, _, position in cvs
+                                               if position is not None)]
+        return ReviewSession(cv_files, results, keyword_offsets, offset_keywords, selected, settings)
+
+    def delete(self, name):
+        row = self.database.query_one("SELECT id, arrays_dir FROM review_sessions WHERE name = ?", (name,))
+        if row is None:
+            return
+        with self.database.transaction() as connection:
+            connection.execute("DELETE FROM review_session_cvs WHERE session_id = ?", (row[0],))
+            connection.execute("DELETE FROM review_sessions WHERE id = ?", (row[0],))
+        shutil.rmtree(os.path.join(self.sessions_dir, row[1]), ignore_errors=True)
@@ -1,106 +1,173 @@
 import sqlite3
 import os
 
-def setup_database():
+# Stored in PRAGMA user_version once the schema and sample data are in place
+SCHEMA_VERSION = 2
+
+# Weighted keywords for the sample sets
+SAMPLE_SET_MAPPINGS = [
+    ('SEO Content Writer', 'SEO', 3), ('SEO Content Writer', 'Content Strategy', 2),
+    ('SEO Content Writer', 'Copywriting', 2), ('SEO Content Writer', 'Blogging', 1),
+    ('SEO Content Writer', 'WordPress', 1), ('SEO Content Writer', 'Google Analytics', 1),
+    
+    ('Software Developer', 'Python', 3), ('Software Developer', 'JavaScript', 2),
+    ('Software Developer', 'SQL', 2), ('Software Developer', 'API Development', 2),
+    ('Software Developer', 'Docker', 1), ('Software Developer', 'Kubernetes', 1),
+    ('Software Developer', 'DevOps', 1),
+    
+    ('Digital Marketer', 'Social Media Marketing', 3), ('Digital Marketer', 'SEO', 2),
+    ('Digital Marketer', 'SEM', 2), ('Digital Marketer', 'Google Analytics', 2),
+    ('Digital Marketer', 'Content Marketing', 2), ('Digital Marketer', 'Email Marketing', 1)
+]
+
+def add_sample_set_mappings(cursor, set_names=None):
+    """Add the weighted keywords of the sample sets (only those in set_names if given)"""
+    # keyword_set_mappings has no unique constraint, so skip existing pairs
+    cursor.executemany('''
+    INSERT INTO keyword_set_mappings (set_id, keyword_id, weight)
+    SELECT s.id, k.id, ? FROM keyword_sets s, keywords k
+    WHERE s.name = ? AND k.keyword = ?
+    AND NOT EXISTS (SELECT 1 FROM keyword_set_mappings m WHERE m.set_id = s.id AND m.keyword_id = k.id)
+    ''', [(weight, set_name, keyword) for set_name, keyword, weight in SAMPLE_SET_MAPPINGS
+          if set_names is None or set_name in set_names])
+
+def setup_database(db_path=None):
+    """Create the schema and sample data if they aren't there yet.
+
+    Safe to call on every start-up: a database that is already set up is only
+    checked, so keywords the user deleted don't come back. Returns True if
+    anything was created.
+    """
+    if db_path is None:
+        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cv_shuffler.db')
+    
     # Create database directory if it doesn't exist
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    data_dir = os.path.dirname(db_path)
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
     
     # Connect to SQLite database (will create if it doesn't exist)
-    db_path = os.path.join(data_dir, 'cv_shuffler.db')
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # Create tables
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS job_categories (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        description TEXT
-    )
-    ''')
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS keywords (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        keyword TEXT NOT NULL UNIQUE,
-        category_id INTEGER,
-        FOREIGN KEY (category_id) REFERENCES job_categories (id)
-    )
-    ''')
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS keyword_sets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        description TEXT
-    )
-    ''')
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS keyword_set_mappings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        set_id INTEGER,
-        keyword_id INTEGER,
-        weight INTEGER DEFAULT 1,
-        FOREIGN KEY (set_id) REFERENCES keyword_sets (id),
-        FOREIGN KEY (keyword_id) REFERENCES keywords (id)
-    )
-    ''')
-    
-    # Insert default job categories
-    categories = [
-        ('Technology & IT', 'Software development, IT infrastructure, cybersecurity'),
-        ('Marketing & Sales', 'Digital marketing, sales, advertising, SEO'),
-        ('Content Creation', 'Writing, editing, content strategy, blogging'),
-        ('Design & Creative', 'Graphic design, UX/UI, multimedia'),
-        ('Business & Management', 'Project management, operations, administration'),
-        ('Healthcare', 'Medical professions, nursing, healthcare administration'),
-        ('Education', 'Teaching, academic research, educational administration'),
-        ('Engineering', 'Civil, mechanical, electrical, chemical engineering'),
-        ('Finance', 'Accounting, banking, financial analysis'),
-        ('Hospitality', 'Hotel management, culinary arts, tourism'),
-        ('Legal', 'Law, paralegal, compliance'),
-        ('Science & Research', 'Scientific research, laboratory work, R&D'),
-        ('Skilled Trades', 'Construction, manufacturing, technical trades'),
-        ('Human Resources', 'Recruitment, talent management, HR operations')
-    ]
-    
-    cursor.executemany('INSERT OR IGNORE INTO job_categories (name, description) VALUES (?, ?)', categories)
-    
-    # Insert sample keywords (just a small sample - you'll add more)
-    keywords = [
-        # Technology & IT
-        ('Python', 1), ('JavaScript', 1), ('SQL', 1), ('Cloud Computing', 1), ('Cybersecurity', 1),
-        ('DevOps', 1), ('Machine Learning', 1), ('API Development', 1), ('Docker', 1), ('Kubernetes', 1),
+    # A database set up before the version was recorded is still at 0, and
+    # goes through the whole setup: every step below is idempotent, and it
+    # may lack sample data added since (e.g. the keyword set weights)
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        conn.close()
+        return False
+    
+    if version < 1:
+        # Create tables
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT
+        )
+        ''')
+    
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL UNIQUE,
+            category_id INTEGER,
+            FOREIGN KEY (category_id) REFERENCES job_categories (id)
+        )
+        ''')
+    
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_sets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT
+        )
+        ''')
+    
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_set_mappings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            set_id INTEGER,
+            keyword_id INTEGER,
+            weight INTEGER DEFAULT 1,
+            FOREIGN KEY (set_id) REFERENCES keyword_sets (id),
+            FOREIGN KEY (keyword_id) REFERENCES keywords (id)
+        )
+        ''')
+    
+        # Insert default job categories
+        categories = [
+            ('Technology & IT', 'Software development, IT infrastructure, cybersecurity'),
+            ('Marketing & Sales', 'Digital marketing, sales, advertising, SEO'),
+            ('Content Creation', 'Writing, editing, content strategy, blogging'),
+            ('Design & Creative', 'Graphic design, UX/UI, multimedia'),
+            ('Business & Management', 'Project management, operations, administration'),
+            ('Healthcare', 'Medical professions, nursing, healthcare administration'),
+            ('Education', 'Teaching, academic research, educational administration'),
+            ('Engineering', 'Civil, mechanical, electrical, chemical engineering'),
+            ('Finance', 'Accounting, banking, financial analysis'),
+            ('Hospitality', 'Hotel management, culinary arts, tourism'),
+            ('Legal', 'Law, paralegal, compliance'),
+            ('Science & Research', 'Scientific research, laboratory work, R&D'),
+            ('Skilled Trades', 'Construction, manufacturing, technical trades'),
+            ('Human Resources', 'Recruitment, talent management, HR operations')
+        ]
+    
+        cursor.executemany('INSERT OR IGNORE INTO job_categories (name, description) VALUES (?, ?)', categories)
+    
+        # Insert sample keywords (just a small sample - you'll add more)
+        keywords = [
+            # Technology & IT
+            ('Python', 1), ('JavaScript', 1), ('SQL', 1), ('Cloud Computing', 1), ('Cybersecurity', 1),
+            ('DevOps', 1), ('Machine Learning', 1), ('API Development', 1), ('Docker', 1), ('Kubernetes', 1),
         
-        # Marketing & Sales
-        ('SEO', 2), ('SEM', 2), ('Google Analytics', 2), ('Social Media Marketing', 2), ('Content Marketing', 2),
-        ('Email Marketing', 2), ('CRM', 2), ('Sales Funnel', 2), ('Market Research', 2), ('Brand Management', 2),
+            # Marketing & Sales
+            ('SEO', 2), ('SEM', 2), ('Google Analytics', 2), ('Social Media Marketing', 2), ('Content Marketing', 2),
+            ('Email Marketing', 2), ('CRM', 2), ('Sales Funnel', 2), ('Market Research', 2), ('Brand Management', 2),
         
-        # Content Creation
-        ('Content Strategy', 3), ('Copywriting', 3), ('Blogging', 3), ('Technical Writing', 3), ('Editing', 3),
-        ('Proofreading', 3), ('Content Management', 3), ('WordPress', 3), ('Ghostwriting', 3), ('Storytelling', 3),
+            # Content Creation
+            ('Content Strategy', 3), ('Copywriting', 3), ('Blogging', 3), ('Technical Writing', 3), ('Editing', 3),
+            ('Proofreading', 3), ('Content Management', 3), ('WordPress', 3), ('Ghostwriting', 3), ('Storytelling', 3),
         
-        # Add more keywords for other categories as needed
-    ]
+            # Add more keywords for other categories as needed
+        ]
+    
+        cursor.executemany('INSERT OR IGNORE INTO keywords (keyword, category_id) VALUES (?, ?)', keywords)
+    
+        # Create some sample keyword sets
+        keyword_sets = [
+            ('SEO Content Writer', 'Keywords for SEO content writer positions'),
+            ('Software Developer', 'Keywords for software developer positions'),
+            ('Digital Marketer', 'Keywords for digital marketing roles')
+        ]
+    
+        cursor.executemany('INSERT OR IGNORE INTO keyword_sets (name, description) VALUES (?, ?)', keyword_sets)
     
-    cursor.executemany('INSERT OR IGNORE INTO keywords (keyword, category_id) VALUES (?, ?)', keywords)
+        add_sample_set_mappings(cursor)
     
-    # Create some sample keyword sets
-    keyword_sets = [
-        ('SEO Content Writer', 'Keywords for SEO content writer positions'),
-        ('Software Developer', 'Keywords for software developer positions'),
-        ('Digital Marketer', 'Keywords for digital marketing roles')
-    ]
+    if version < 2:
+        # The corpus index is now an index over the text cache; its old
+        # tables here held a second copy of every CV's text
+        cursor.execute("DROP TABLE IF EXISTS cv_text_index")
+        cursor.execute("DROP TABLE IF EXISTS cv_documents")
+        if version == 1:
+            # Databases from before the version was recorded were stamped 1
+            # without their sample set weights, leaving those sets empty
+            empty_sets = {name for (name,) in cursor.execute(
+                "SELECT name FROM keyword_sets s "
+                "WHERE NOT EXISTS (SELECT 1 FROM keyword_set_mappings m WHERE m.set_id = s.id)")}
+            add_sample_set_mappings(cursor, empty_sets)
     
-    cursor.executemany('INSERT OR IGNORE INTO keyword_sets (name, description) VALUES (?, ?)', keyword_sets)
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     
     # Commit changes and close connection
     conn.commit()
     conn.close()
-    print("Database setup completed successfully!")
+    return True
 
 if __name__ == '__main__':
-    setup_database()
\ No newline at end of file
+    if setup_database():
+        print("Database setup completed successfully!")
+    else:
+        print("Database is already set up.")
\ No newline at end of file
@@ -0,0 +1,110 @@
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from instrumentation import stats
+from ranking import BM25Index, corpus_texts
+
+
+class KeywordFilterWorker(QThread):
+    """Runs an IngestionEngine pass off the GUI thread"""
+
+    chunk_ready = pyqtSignal(list)   # list of (file_path, matches, offsets)
+    progress = pyqtSignal(int, int)  # processed, total (0 when streaming)
+    failed = pyqtSignal(str)  # error message; run_finished still follows
+    run_finished = pyqtSignal(bool)  # True if the run was cancelled
+
+    def __init__(self, engine, file_paths, keywords, case_sensitive, cache=None, index=None,
+                 stop_rule=None, duplicates=None, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.index = index
+        self.duplicates = duplicates
+        # A list, or a lazy generator (e.g. a folder scan) of unknown length
+        self.file_paths = file_paths
+        self.keywords = keywords
+        self.case_sensitive = case_sensitive
+        self.cache = cache
+        # threshold/weights/max_pages keyword arguments for early exit
+        self.stop_rule = stop_rule or {}
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        processed = 0
+        total = len(self.file_paths) if isinstance(self.file_paths, list) else 0
+        results = None
+        # An exception escaping run() would abort the whole application, so a
+        # failed run (e.g. a broken pool or a locked database) is reported
+        # instead, keeping the CVs scored before it
+        try:
+            results = self.engine.run(self.file_paths, self.keywords, self.case_sensitive,
+                                      cache=self.cache, index=self.index, chunk_size=20,
+                                      duplicates=self.duplicates, **self.stop_rule)
+            for chunk in results:
+                processed += len(chunk)
+                self.chunk_ready.emit(chunk)
+                self.progress.emit(processed, total)
+                if self.cancelled:
+                    break
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # Start a fresh pool on the next run
+                self.engine.shutdown()
+            self.failed.emit(str(e) or type(e).__name__)
+        finally:
+            if results is not None:
+                try:
+                    results.close()
+                except Exception as e:
+                    self.failed.emit(str(e) or type(e).__name__)
+            self.run_finished.emit(self.cancelled)
+
+
+class PreviewPrefetchWorker(QThread):
+    """Renders CV previews into a PreviewCache ahead of the user browsing to them"""
+
+    def __init__(self, preview_cache, file_paths, text_cache=None, parent=None):
+        super().__init__(parent)
+        self.preview_cache = preview_cache
+        self.file_paths = file_paths
+        self.text_cache = text_cache
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        for file_path in self.file_paths:
+            if self.cancelled:
+                break
+            self.preview_cache.prefetch(file_path, self.text_cache)
+
+
+class RankingIndexWorker(QThread):
+    """Builds a BM25Index of CVs off the GUI thread"""
+
+    index_ready = pyqtSignal(object)  # the BM25Index, or None if cancelled
+
+    def __init__(self, file_paths, cache=None, index=None, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.cache = cache
+        self.index = index
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        def documents():
+            for document in corpus_texts(self.file_paths, self.cache, self.index):
+                if self.cancelled:
+                    return
+                yield document
+
+        with stats.timer("ranking.build"):
+            ranking_index = BM25Index.build(documents())
+        self.index_ready.emit(None if self.cancelled else ranking_index)